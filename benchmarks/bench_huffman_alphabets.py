@@ -0,0 +1,57 @@
+"""
+Compression ratio and throughput of the Huffman symbol alphabets on real text.
+
+For each corpus file and each alphabet of Huffman.tokenize, the text is encoded in the
+plain format then decoded. The report gives the number of symbols and of distinct
+symbols, the size of the encoded data and of its JSON dictionary, the bits spent per
+kept character (dictionary excluded) and the encode / decode throughput in MB of text
+per second.
+
+Usage:
+    python benchmarks/bench_huffman_alphabets.py [corpus_file ...]
+
+Without corpus files, the README of the repository is used.
+"""
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from huffman.Huffman import Huffman
+
+
+def main():
+    corpus_files = sys.argv[1:] or [os.path.join(ROOT, "README.md")]
+
+    for corpus_file in corpus_files:
+        with open(corpus_file, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+        characters = len(Huffman.tokenize(text.lower(), "char"))
+        megabytes = len(text.encode()) / 1e6
+
+        print(f"{corpus_file}: {len(text.encode())} bytes, {characters} kept characters")
+        print(f"{'alphabet':<10}{'symbols':>10}{'distinct':>10}{'data (B)':>11}{'dict (B)':>10}"
+              f"{'bits/char':>11}{'encode (MB/s)':>15}{'decode (MB/s)':>15}")
+        for alphabet in Huffman.ALPHABETS:
+            start = time.perf_counter()
+            data, code_dict = Huffman.encode_text(text, alphabet=alphabet)
+            encode_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            decoded = Huffman.decode_data(data, code_dict)
+            decode_time = time.perf_counter() - start
+            if len(decoded) != characters:
+                raise AssertionError(f"The {alphabet} alphabet did not round-trip.")
+
+            symbols = len(Huffman.tokenize(text.lower(), alphabet))
+            print(f"{alphabet:<10}{symbols:>10}{len(code_dict):>10}{len(data):>11}"
+                  f"{len(json.dumps(code_dict)):>10}{len(data) * 8 / max(characters, 1):>11.3f}"
+                  f"{megabytes / encode_time:>15.2f}{megabytes / decode_time:>15.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Decode throughput of the interleaved block format against the plain Huffman stream.
+
+A text is encoded once as the plain stream written by Huffman.compress and once in the
+block format for several numbers of streams. For a single block and for the whole
+text, the report gives the symbols decoded per second by the plain decoder, by the
+serial lane decoder and by the NumPy lockstep decoder.
+
+Usage:
+    python benchmarks/bench_huffman_streams.py [corpus_file] [blocks]
+
+Without a corpus file, a random text with English letter frequencies is used. The
+text is repeated or cut to the given number of blocks (default 16).
+"""
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from huffman.Huffman import Huffman
+
+STREAMS = [1, 2, 4, 8, 16, 32, 64]
+
+# Approximate frequencies (percent) of a-z and space in English text.
+FREQUENCIES = [6.5, 1.2, 2.2, 3.4, 10.2, 1.8, 1.6, 4.9, 5.6, 0.1, 0.6, 3.2, 1.9, 5.4, 6.0, 1.5, 0.1,
+               4.8, 5.1, 7.3, 2.2, 0.8, 1.9, 0.1, 1.6, 0.1, 18.3]
+
+
+def load_text(corpus_file, symbols):
+    if corpus_file:
+        with open(corpus_file, "r", encoding="utf-8", errors="ignore") as f:
+            text = "".join(ch for ch in f.read().lower() if ch in "abcdefghijklmnopqrstuvwxyz ")
+    else:
+        text = "".join(random.Random(0).choices("abcdefghijklmnopqrstuvwxyz ", FREQUENCIES, k=symbols))
+    if not text:
+        raise ValueError("The corpus holds no letters.")
+    return (text * (symbols // len(text) + 1))[:symbols]
+
+
+def throughput(decoder, symbols):
+    start = time.perf_counter()
+    decoder()
+    return symbols / (time.perf_counter() - start) / 1e6
+
+
+def report(label, text):
+    plain, code_dict = Huffman.encode_text(text)
+    print(f"{label}: {len(text)} symbols, plain decoder "
+          f"{throughput(lambda: Huffman.decode_data(plain, code_dict), len(text)):.2f} Msymbols/s")
+    print(f"{'streams':>8}{'lanes':>8}{'serial (Msym/s)':>17}{'lockstep (Msym/s)':>19}")
+    for streams in STREAMS:
+        data, code_dict = Huffman.encode_text(text, streams=streams)
+        f = io.BytesIO(data)
+        version, _, block_symbols, _ = Huffman.read_block_header(f)
+        group = list(Huffman.iter_blocks(f, version, streams, block_symbols))
+        joined, blocks = Huffman.join_blocks(group)
+        serial = throughput(lambda: Huffman.decode_lanes_serially(joined, code_dict, streams, blocks), len(text))
+        lockstep = throughput(lambda: Huffman.decode_lanes_in_lockstep(joined, code_dict, streams, blocks),
+                              len(text))
+        print(f"{streams:>8}{streams * len(blocks):>8}{serial:>17.2f}{lockstep:>19.2f}")
+    print()
+
+
+def main():
+    corpus_file = sys.argv[1] if len(sys.argv) > 1 else None
+    blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    text = load_text(corpus_file, blocks * Huffman.BLOCK_SYMBOLS)
+    report("Single block", text[:Huffman.BLOCK_SYMBOLS])
+    report(f"{blocks} blocks", text)
+
+
+if __name__ == "__main__":
+    main()
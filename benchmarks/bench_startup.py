@@ -0,0 +1,79 @@
+"""
+Start-up cost of the application.
+
+Reports, each measured in a fresh interpreter started from the repository root:
+  - the cumulative import time (python -X importtime) of the Huffman core alone,
+    of the steganography and language evaluation engines, and of the GUI module
+    (which includes ttkbootstrap and the PIL modules it imports; only the engines and
+    NumPy are deferred);
+  - the time to first window: importing the GUI, building CompressionApp and
+    processing its first events. This needs a display and ttkbootstrap.
+
+Usage:
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "huffman.Huffman",
+    "steganography.Steganography",
+    "evaluator.LanguageEvaluator",
+    "huffman.CompressionApp",
+]
+
+FIRST_WINDOW = """
+import time
+start = time.perf_counter()
+from huffman.CompressionApp import CompressionApp
+app = CompressionApp()
+app.update()
+print(time.perf_counter() - start)
+app.destroy()
+"""
+
+
+def import_time(module):
+    """Returns the cumulative import time of a module in seconds, as reported by -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    raise RuntimeError(f"{module} not found in the import time report")
+
+
+def first_window_time():
+    """Returns the time to first window in seconds."""
+    result = subprocess.run([sys.executable, "-c", FIRST_WINDOW], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return float(result.stdout)
+
+
+def report(name, measure, runs):
+    try:
+        times = [measure() for _ in range(runs)]
+    except RuntimeError as e:
+        print(f"{name:<40}unavailable ({e})")
+        return
+    print(f"{name:<40}{statistics.median(times) * 1000:>10.1f} ms")
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    for module in MODULES:
+        report(f"import {module}", lambda: import_time(module), runs)
+    report("time to first window", first_window_time, runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Throughput of image and audio steganography for every embedding depth.
+
+For each carrier and depth, a random payload filling the carrier is embedded then
+extracted. The report gives the payload bits handled per second and the number of
+payload bits stored per byte of raw carrier data (pixels or PCM frames).
+
+A second table compares, for small to full payloads and for a seeded key, the time
+spent reading the image values an extraction needs: by PngRowReader alone, by a full
+decode with PIL, and by Steganography.read_image_prefix which picks one of them.
+
+Usage:
+    python benchmarks/bench_steganography.py [image_size] [audio_seconds]
+"""
+import os
+import sys
+import tempfile
+import time
+import wave
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from steganography.IndexKey import IndexKey
+from steganography.PngRowReader import PngRowReader
+from steganography.Steganography import Steganography
+
+
+def make_carriers(folder, image_size, audio_seconds):
+    rng = np.random.default_rng(0)
+    image_path = os.path.join(folder, "carrier.png")
+    Image.fromarray(rng.integers(0, 256, (image_size, image_size, 3), dtype=np.uint8)).save(image_path)
+
+    audio_path = os.path.join(folder, "carrier.wav")
+    with wave.open(audio_path, "wb") as wav_out:
+        wav_out.setnchannels(2)
+        wav_out.setsampwidth(2)
+        wav_out.setframerate(44100)
+        wav_out.writeframes(rng.integers(0, 256, audio_seconds * 44100 * 4, dtype=np.uint8).tobytes())
+
+    return [
+        ("image", image_path, image_size * image_size * 3, Steganography.image_capacity,
+         Steganography.embed_payload_in_image, Steganography.extract_payload_from_image),
+        ("audio", audio_path, audio_seconds * 44100 * 4, Steganography.audio_capacity,
+         Steganography.embed_payload_in_audio, Steganography.extract_payload_from_audio),
+    ]
+
+
+def timed(read):
+    start = time.perf_counter()
+    read()
+    return time.perf_counter() - start
+
+
+def compare_image_reads(folder, image_path):
+    """Times reading the values needed by an extraction, for several payload sizes."""
+    capacity = Steganography.image_capacity(image_path, 1)
+    output_path = os.path.join(folder, "prefix.png")
+    key_path = os.path.join(folder, "prefix.key")
+
+    print()
+    print(f"{'payload':<16}{'rows':>8}{'row reader (s)':>16}{'full decode (s)':>17}{'prefix read (s)':>17}")
+    for label, size, seed in [("0.1%", capacity // 1000, None), ("1%", capacity // 100, None),
+                              ("10%", capacity // 10, None), ("100%", capacity, None),
+                              ("1%, seeded", capacity // 100, 1)]:
+        Steganography.embed_payload_in_image(image_path, os.urandom(size), output_path, key_path, seed=seed)
+        indices, _, _ = IndexKey.load(key_path)
+        count = int(indices.max()) + 1
+        with Image.open(output_path) as img:
+            rows = -(-count // (img.width * len(img.getbands())))
+        scattered = IndexKey.kind(key_path) == IndexKey.SEEDED
+
+        def read_prefix():
+            with Image.open(output_path) as lazy:
+                Steganography.read_image_prefix(lazy, count, allow_partial=not scattered)
+
+        def full_decode():
+            with Image.open(output_path) as lazy:
+                np.asarray(lazy)
+
+        print(f"{label:<16}{rows:>8}{timed(lambda: PngRowReader(output_path).read_rows(rows)):>16.3f}"
+              f"{timed(full_decode):>17.3f}{timed(read_prefix):>17.3f}")
+
+
+def main():
+    image_size = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    audio_seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+
+    with tempfile.TemporaryDirectory() as folder:
+        carriers = make_carriers(folder, image_size, audio_seconds)
+        key_path = os.path.join(folder, "output.key")
+
+        print(f"{'carrier':<8}{'depth':>6}{'payload (KiB)':>15}{'embed (Mbit/s)':>16}"
+              f"{'extract (Mbit/s)':>18}{'bits/carrier byte':>19}")
+        for name, path, carrier_bytes, capacity, embed, extract in carriers:
+            output_path = os.path.join(folder, "output" + os.path.splitext(path)[1])
+            for depth in range(1, Steganography.MAX_DEPTH + 1):
+                payload = os.urandom(capacity(path, depth))
+                bits = len(payload) * 8
+
+                start = time.perf_counter()
+                embed(path, payload, output_path, key_path, depth=depth)
+                embed_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                extracted, _ = extract(output_path, key_path)
+                extract_time = time.perf_counter() - start
+                assert extracted == payload
+
+                print(f"{name:<8}{depth:>6}{len(payload) / 1024:>15.0f}{bits / embed_time / 1e6:>16.1f}"
+                      f"{bits / extract_time / 1e6:>18.1f}{bits / carrier_bytes:>19.2f}")
+
+        compare_image_reads(folder, carriers[0][1])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,359 @@
+import heapq
 import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+
+@dataclass
+class EvaluationResult:
+    """
+    Outcome of the evaluation of one code by LanguageEvaluator.evaluate_languages.
+
+    For ambiguous codes, witness holds a shortest string having two distinct
+    factorizations over the code, and factorizations holds those two factorizations.
+    """
+    source: str
+    uniquely_decodable: Optional[bool]
+    witness: Optional[str] = None
+    factorizations: Optional[tuple[list[str], list[str]]] = None
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    code_size: int = 0
+
 
 class LanguageEvaluator:
+    # Number of explored suffixes between two progress reports.
+    PROGRESS_STEP = 1024
+
     @staticmethod
-    def evaluate_language(language_file: str) -> bool:
-        # 1. Read the original language
-        languages = []
+    def evaluate_language(language_file: str,
+                          progress: Optional[Callable[[int, int], None]] = None) -> bool:
+        """
+        Tells whether the code stored in the given JSON file is uniquely decodable.
+
+        The answer is computed by LanguageEvaluator.is_uniquely_decodable, which runs
+        in polynomial time and always gives an exact verdict.
+
+        :param language_file: Path to a JSON file containing either a list of codewords or
+                              a {letter: code} dictionary as written by Huffman.compress.
+        :param progress: Optional callback, see LanguageEvaluator.is_uniquely_decodable.
+        :return: True if the code is uniquely decodable, False otherwise.
+        """
+        codewords = LanguageEvaluator.load_code(language_file)
+        code = set(codewords)
+        if len(code) < len(codewords):
+            # Two letters share the same codeword.
+            return False
+
+        return LanguageEvaluator.is_uniquely_decodable(code, progress)
+
+    @staticmethod
+    def load_code(language_file: str) -> list[str]:
+        """
+        Reads the codewords stored in a JSON file.
+
+        Both a plain list of codewords and the {letter: code} dictionary produced by
+        Huffman.compress are accepted. A list is read as a language, so repeated entries
+        are merged; the codewords of a dictionary are returned as is, so that a codeword
+        shared by two letters can be detected by the caller.
+        """
         with open(language_file, "r") as lf:
-            languages.append(set(json.load(lf)))
+            data = json.load(lf)
+
+        if isinstance(data, dict):
+            return list(data.values())
+        return list(set(data))
+
+    @staticmethod
+    def is_prefix_free(code: Iterable[str]) -> bool:
+        """
+        Tells whether no codeword is a prefix of another one, in O(n log n) comparisons.
+
+        Once the codewords are sorted, every word lying between a word and one of its
+        extensions shares that prefix, so only adjacent pairs need to be compared.
+        """
+        words = sorted(code)
+        for shorter, longer in zip(words, words[1:]):
+            if longer.startswith(shorter):
+                return False
+        return True
+
+    @staticmethod
+    def satisfies_kraft(code: Iterable[str]) -> bool:
+        """
+        Checks the Kraft-McMillan inequality sum(D ** -len(word)) <= 1, where D is the
+        number of distinct symbols used by the codewords. Every uniquely decodable code
+        satisfies it, so a code violating it is ambiguous.
+
+        The sum is computed exactly with integers scaled by D ** max_length.
+        """
+        words = list(code)
+        if not words:
+            return True
+
+        radix = len(set("".join(words)))
+        max_length = max(len(word) for word in words)
+        if radix <= 1:
+            # Only the empty word or powers of a single symbol: at most one codeword fits.
+            return len(words) <= 1
+
+        total = sum(radix ** (max_length - len(word)) for word in words)
+        return total <= radix ** max_length
+
+    @staticmethod
+    def evaluate_language_quotient(language_file: str,
+                                   progress: Optional[Callable[[int], None]] = None) -> bool:
+        """
+        Original Sardinas-Patterson implementation based on successive quotient sets.
+
+        It gives up (and answers True) after 1000 iterations, so it is only kept to
+        cross-validate LanguageEvaluator.is_uniquely_decodable on small codes.
+
+        :param language_file: Path to a JSON file containing either a list of codewords or
+                              a {letter: code} dictionary as written by Huffman.compress.
+        :param progress: Optional callback receiving the current iteration number.
+        """
+        # 1. Read the original language
+        codewords = LanguageEvaluator.load_code(language_file)
+        languages = [set(codewords)]
+        if len(languages[0]) < len(codewords):
+            # Two letters share the same codeword.
+            return False
 
         languages.append(LanguageEvaluator.get_quotient(languages[0], languages[0]))
         languages[1].remove("")
 
         i = 1
         while i <= 1000:
-            print(i)
+            if progress is not None:
+                progress(i)
             new_language = LanguageEvaluator.get_quotient(languages[0], languages[i])
             current_quotient = LanguageEvaluator.get_quotient(languages[i], languages[0])
             new_language.update(current_quotient)
-            
+
             if "" in new_language:
                 return False
-            
+
             for previous in languages:
                 if previous == new_language:
                     return True
-            
+
             languages.append(new_language)
             i += 1
 
         return True
 
+    @staticmethod
+    def is_uniquely_decodable(code: set[str],
+                              progress: Optional[Callable[[int, int], None]] = None) -> bool:
+        """
+        Sardinas-Patterson test expressed as a reachability problem.
+
+        Every dangling suffix is a suffix of some codeword, so there are at most
+        sum(len(word)) of them. Starting from the suffixes left over when a codeword is a
+        proper prefix of another one, a breadth-first search follows the quotient
+        relation in both directions. The code is ambiguous if and only if the empty
+        suffix is reachable, i.e. a dangling suffix is itself a codeword.
+
+        Two cheap checks run first: prefix-free codes (every Huffman dictionary) are
+        accepted after a sort, and codes violating the Kraft inequality are rejected.
+
+        :param code: The set of codewords.
+        :param progress: Optional callback receiving (explored_suffixes, max_suffixes) while
+                         the suffix graph is explored; max_suffixes bounds the graph size.
+        :return: True if the code is uniquely decodable, False otherwise.
+        """
+        if "" in code:
+            return False
+        if LanguageEvaluator.is_prefix_free(code):
+            return True
+        if not LanguageEvaluator.satisfies_kraft(code):
+            return False
+
+        words = list(code)
+        seen = set()
+        queue = deque()
+
+        # 1. Initial dangling suffixes: u is a proper prefix of w.
+        for u in words:
+            for suffix in LanguageEvaluator.get_residual(u, code):
+                if suffix and suffix not in seen:
+                    seen.add(suffix)
+                    queue.append(suffix)
+
+        # 2. Explore the suffix graph until the empty word is reached or no new node appears.
+        max_suffixes = sum(len(word) for word in words)
+        explored = 0
+        while queue:
+            suffix = queue.popleft()
+            explored += 1
+            if progress is not None and explored % LanguageEvaluator.PROGRESS_STEP == 0:
+                progress(explored, max_suffixes)
+            for word in words:
+                if word.startswith(suffix):
+                    successor = word[len(suffix):]
+                elif suffix.startswith(word):
+                    successor = suffix[len(word):]
+                else:
+                    continue
+
+                if successor == "":
+                    return False
+                if successor not in seen:
+                    seen.add(successor)
+                    queue.append(successor)
+
+        return True
+
+    @staticmethod
+    def find_ambiguous_witness(code: set[str]) -> Optional[tuple[str, list[str], list[str]]]:
+        """
+        Looks for a shortest string having two distinct factorizations over the code.
+
+        This walks the same dangling-suffix graph as LanguageEvaluator.is_uniquely_decodable,
+        but with Dijkstra's algorithm: the weight of an edge is the number of characters
+        it appends to the leading factorization. Parent pointers are kept so the two
+        factorizations can be replayed once the empty suffix is reached.
+
+        :param code: The set of codewords.
+        :return: None if the code is uniquely decodable, otherwise a tuple
+                 (witness, first_factorization, second_factorization).
+        """
+        if "" in code:
+            return "", [], [""]
+        if LanguageEvaluator.is_prefix_free(code):
+            return None
+
+        words = list(code)
+        best = {}
+        parents = {}
+        heap = []
+
+        # 1. Initial dangling suffixes, weighted by the length of the longer codeword.
+        for u in words:
+            for w in words:
+                if len(u) < len(w) and w.startswith(u):
+                    suffix = w[len(u):]
+                    if suffix not in best or len(w) < best[suffix]:
+                        best[suffix] = len(w)
+                        parents[suffix] = (None, (u, w))
+                        heapq.heappush(heap, (len(w), suffix))
+
+        # 2. Dijkstra over the suffix graph until the empty suffix is settled.
+        settled = set()
+        while heap:
+            cost, suffix = heapq.heappop(heap)
+            if suffix in settled:
+                continue
+            settled.add(suffix)
+            if suffix == "":
+                break
+
+            for word in words:
+                if word.startswith(suffix):
+                    successor = word[len(suffix):]
+                    new_cost = cost + len(successor)
+                elif suffix.startswith(word):
+                    successor = suffix[len(word):]
+                    new_cost = cost
+                else:
+                    continue
+
+                if successor not in best or new_cost < best[successor]:
+                    best[successor] = new_cost
+                    parents[successor] = (suffix, word)
+                    heapq.heappush(heap, (new_cost, successor))
+        else:
+            return None
+
+        # 3. Rebuild the sequence of appended codewords, then replay both factorizations.
+        steps = []
+        state = ""
+        while True:
+            previous, step = parents[state]
+            if previous is None:
+                shorter, longer = step
+                break
+            steps.append(step)
+            state = previous
+        steps.reverse()
+
+        leading, lagging = [longer], [shorter]
+        leading_length, lagging_length = len(longer), len(shorter)
+        for word in steps:
+            lagging.append(word)
+            lagging_length += len(word)
+            if lagging_length > leading_length:
+                leading, lagging = lagging, leading
+                leading_length, lagging_length = lagging_length, leading_length
+
+        return "".join(leading), leading, lagging
+
+    @staticmethod
+    def evaluate_languages(language_files: Iterable[str], max_workers: Optional[int] = None,
+                           progress: Optional[Callable[[int, int, EvaluationResult], None]] = None
+                           ) -> list[EvaluationResult]:
+        """
+        Evaluates many codes in parallel on a process pool.
+
+        A file that cannot be read or parsed does not stop the batch: its result carries
+        the error message and uniquely_decodable is None.
+
+        :param language_files: Paths to JSON files containing lists of codewords or
+                               {letter: code} dictionaries.
+        :param max_workers: Number of worker processes (defaults to the number of CPUs).
+        :param progress: Optional callback receiving (completed, total, result) each time
+                         a code has been evaluated.
+        :return: One EvaluationResult per input file, in the input order.
+        """
+        language_files = list(language_files)
+        total = len(language_files)
+        results: list[Optional[EvaluationResult]] = [None] * total
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(LanguageEvaluator.evaluate_language_file, path): i
+                for i, path in enumerate(language_files)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results[futures[future]] = result
+                if progress is not None:
+                    progress(completed, total, result)
+
+        return results
+
+    @staticmethod
+    def evaluate_language_file(language_file: str) -> EvaluationResult:
+        """
+        Evaluates a single code file and wraps the verdict, a witness and timings in an
+        EvaluationResult. Errors are reported in the result instead of being raised.
+        """
+        start = time.perf_counter()
+        try:
+            codewords = LanguageEvaluator.load_code(language_file)
+            code = set(codewords)
+            if len(code) < len(codewords):
+                # Two letters share a codeword: that codeword alone is the witness.
+                shared = next(word for word in code if codewords.count(word) > 1)
+                found = shared, [shared], [shared]
+            else:
+                found = LanguageEvaluator.find_ambiguous_witness(code)
+            result = EvaluationResult(source=language_file, uniquely_decodable=found is None,
+                                      code_size=len(code))
+            if found is not None:
+                witness, first, second = found
+                result.witness = witness
+                result.factorizations = (first, second)
+        except Exception as e:
+            result = EvaluationResult(source=language_file, uniquely_decodable=None, error=str(e))
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
     @staticmethod
     def get_residual(letter: str, language: set[str]) -> set[str]:
         residual = set()
@@ -37,10 +361,10 @@ class LanguageEvaluator:
             if element.startswith(letter):
                 residual.add(element.removeprefix(letter))
         return residual
-    
+
     @staticmethod
     def get_quotient(left_language: set[str], right_language: set[str]) -> set[str]:
         quotient = set()
         for left_letter in left_language:
             quotient.update(LanguageEvaluator.get_residual(left_letter, right_language))
-        return quotient
\ No newline at end of file
+        return quotient
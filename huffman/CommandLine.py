@@ -0,0 +1,310 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import Optional
+
+from huffman.Huffman import Huffman
+# The steganography and language evaluation engines (and NumPy / PIL behind them) are
+# imported by the subcommands that use them. Nothing here imports tkinter.
+
+
+class CommandLine:
+    """
+    Headless entry point of the engines: python -m huffman <subcommand> ...
+
+    Subcommands:
+      - compress:   text files (or "-" for stdin) to .huff files and JSON dictionaries.
+      - decompress: .huff files (or "-" for stdin) back to text.
+      - verify:     check .huff files against their checksums, writing nothing.
+      - hide:       a message (argument or stdin) into one PNG/WAV carrier, or spread over
+                    several carriers with a manifest.
+      - extract:    a hidden message, from a carrier and its key or from a manifest, to stdout.
+      - evaluate:   unique decodability of JSON codes.
+
+    Input patterns are expanded with glob, so that they also work in shells that do not
+    expand them. Many files are processed on a process pool. Once done, timing statistics
+    are printed as one JSON object: on stdout, or on stderr when stdout carries data.
+    """
+    # Value of a path argument standing for stdin or stdout.
+    STDIO = "-"
+
+    @staticmethod
+    def main(argv: Optional[list[str]] = None) -> int:
+        """
+        Runs a subcommand.
+
+        :param argv: The arguments (defaults to sys.argv[1:]).
+        :return: The exit status: 0 on success, 1 if any file failed, 2 if verify could
+                 not check some files because they record no checksum.
+        """
+        args = CommandLine.build_parser().parse_args(argv)
+        start = time.perf_counter()
+        try:
+            stats = args.handler(args)
+        except (OSError, ValueError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+
+        stats = {"command": args.command, **stats, "elapsed": time.perf_counter() - start}
+        if not args.quiet:
+            stream = sys.stderr if stats.pop("stdout_data", False) else sys.stdout
+            json.dump(stats, stream, indent=4)
+            stream.write("\n")
+        files = stats.get("files", [])
+        if any(entry.get("error") for entry in files):
+            return 1
+        return 2 if any("ok" in entry and entry["ok"] is None for entry in files) else 0
+
+    @staticmethod
+    def build_parser() -> argparse.ArgumentParser:
+        """Declares the subcommands and their arguments."""
+        parser = argparse.ArgumentParser(prog="python -m huffman",
+                                         description="Huffman compression, steganography and code evaluation.")
+        parser.add_argument("-q", "--quiet", action="store_true", help="do not print the JSON statistics")
+        subparsers = parser.add_subparsers(dest="command", required=True)
+
+        compress = subparsers.add_parser("compress", help="compress text files")
+        compress.add_argument("inputs", nargs="+", help="text files or glob patterns, or - for stdin")
+        compress.add_argument("-o", "--output-dir",
+                              help="folder of the .huff and _dict.json files (defaults to each input's folder)")
+        compress.add_argument("-d", "--dict", help="dictionary path, required when reading stdin")
+        compress.add_argument("-s", "--streams", type=int,
+                              help="write the interleaved block format with this number of streams per block")
+        compress.add_argument("-a", "--alphabet", choices=Huffman.ALPHABETS, default="char",
+                              help="encode characters, frequent digrams or frequent words")
+        compress.add_argument("-c", "--checksum", action=argparse.BooleanOptionalAction, default=True,
+                              help="record a CRC32 per block and a SHA-256 of the text, for verify "
+                                   "(default; --no-checksum writes the plain format unless --streams is given)")
+        compress.add_argument("-j", "--workers", type=int, help="number of worker processes")
+        compress.set_defaults(handler=CommandLine.compress)
+
+        decompress = subparsers.add_parser("decompress", help="decompress .huff files")
+        decompress.add_argument("inputs", nargs="+", help=".huff files or glob patterns, or - for stdin")
+        decompress.add_argument("-o", "--output-dir",
+                                help="folder of the decoded .txt files (defaults to each input's folder)")
+        decompress.add_argument("-d", "--dict",
+                                help="dictionary path (defaults to <name>_dict.json next to each input)")
+        decompress.add_argument("-f", "--force", action="store_true", help="overwrite existing text files")
+        decompress.add_argument("-j", "--workers", type=int, help="number of worker processes")
+        decompress.set_defaults(handler=CommandLine.decompress)
+
+        verify = subparsers.add_parser("verify", help="check .huff files against their checksums, writing nothing")
+        verify.add_argument("inputs", nargs="+", help=".huff files or glob patterns")
+        verify.add_argument("-d", "--dict",
+                            help="dictionary path (defaults to <name>_dict.json next to each input)")
+        verify.add_argument("-j", "--workers", type=int, help="number of worker processes")
+        verify.set_defaults(handler=CommandLine.verify)
+
+        hide = subparsers.add_parser("hide", help="hide a message in PNG/WAV carriers")
+        hide.add_argument("carriers", nargs="+", help="PNG or WAV carriers or glob patterns")
+        hide.add_argument("-o", "--output", required=True,
+                          help="output carrier, or output folder when several carriers are given")
+        hide.add_argument("-k", "--key", required=True,
+                          help="key file, or manifest file when several carriers are given")
+        hide.add_argument("-m", "--message", help="message to hide (read from stdin when omitted)")
+        hide.add_argument("--depth", type=int, default=1, help="low-order bits used per channel or sample (1-4)")
+        hide.add_argument("--seed", type=int, help="scatter the message pseudo-randomly from this seed")
+        hide.add_argument("--compress", action="store_true", help="Huffman-compress the message")
+        hide.add_argument("-j", "--workers", type=int, help="number of worker processes")
+        hide.set_defaults(handler=CommandLine.hide)
+
+        extract = subparsers.add_parser("extract", help="print a hidden message")
+        extract.add_argument("carrier", nargs="?", help="PNG or WAV carrier")
+        extract.add_argument("-k", "--key", help="key file of the carrier")
+        extract.add_argument("--manifest", help="manifest of a message hidden across several carriers")
+        extract.add_argument("-j", "--workers", type=int, help="number of worker processes")
+        extract.set_defaults(handler=CommandLine.extract)
+
+        evaluate = subparsers.add_parser("evaluate", help="tell whether codes are uniquely decodable")
+        evaluate.add_argument("inputs", nargs="+", help="JSON code files or glob patterns")
+        evaluate.add_argument("-j", "--workers", type=int, help="number of worker processes")
+        evaluate.set_defaults(handler=CommandLine.evaluate)
+
+        return parser
+
+    @staticmethod
+    def expand(patterns: list[str]) -> list[str]:
+        """
+        Expands glob patterns, in order and without duplicates. A pattern matching nothing
+        is kept as is, so that the missing file is reported.
+        """
+        paths = []
+        for pattern in patterns:
+            matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else []
+            for path in matches or [pattern]:
+                if path not in paths:
+                    paths.append(path)
+        return paths
+
+    @staticmethod
+    def run_files(task, jobs: list[tuple], workers: Optional[int]) -> list[dict]:
+        """
+        Runs task(*job) for every job, on a process pool when there are several.
+        Errors are recorded in the returned entries instead of stopping the batch.
+        """
+        if len(jobs) == 1 or workers == 1:
+            return [CommandLine.guarded(task, *job) for job in jobs]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(CommandLine.guarded, task, *job) for job in jobs]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def guarded(task, input_path: str, *args) -> dict:
+        """Runs one file task, timing it and turning its errors into an entry."""
+        start = time.perf_counter()
+        try:
+            entry = task(input_path, *args)
+        except Exception as e:
+            entry = {"input": input_path, "error": str(e)}
+        entry["elapsed"] = time.perf_counter() - start
+        return entry
+
+    # --------------- Huffman ---------------
+    @staticmethod
+    def compress(args) -> dict:
+        inputs = CommandLine.expand(args.inputs)
+        if CommandLine.STDIO in inputs:
+            if len(inputs) > 1:
+                raise ValueError("stdin cannot be mixed with other inputs.")
+            if not args.dict:
+                raise ValueError("--dict is required when compressing stdin.")
+            text = sys.stdin.read()
+            data, code_dict = Huffman.encode_text(text, streams=args.streams, alphabet=args.alphabet,
+                                                  checksum=args.checksum)
+            with open(args.dict, "w") as df:
+                json.dump(code_dict, df, indent=4)
+            sys.stdout.buffer.write(data)
+            sys.stdout.flush()
+            entry = {"input": CommandLine.STDIO, "output": CommandLine.STDIO, "dictionary": args.dict,
+                     "input_bytes": len(text.encode()), "output_bytes": len(data)}
+            return {"stdout_data": True, "files": [entry]}
+
+        jobs = [(path, args.output_dir, args.streams, args.alphabet, args.checksum) for path in inputs]
+        return {"files": CommandLine.run_files(CommandLine.compress_file, jobs, args.workers)}
+
+    @staticmethod
+    def compress_file(file_path: str, output_dir: Optional[str], streams: Optional[int], alphabet: str,
+                      checksum: bool) -> dict:
+        """Compresses one file next to it (or into output_dir), named as by the GUI."""
+        out_folder = output_dir or os.path.dirname(file_path)
+        base = os.path.splitext(os.path.basename(file_path))[0]
+        compressed_filepath = os.path.join(out_folder, base + ".huff")
+        dictionary_filepath = os.path.join(out_folder, base + "_dict.json")
+        Huffman.compress(file_path, compressed_filepath, dictionary_filepath, streams=streams, alphabet=alphabet,
+                         checksum=checksum)
+        return {"input": file_path, "output": compressed_filepath, "dictionary": dictionary_filepath,
+                "input_bytes": os.path.getsize(file_path), "output_bytes": os.path.getsize(compressed_filepath)}
+
+    @staticmethod
+    def decompress(args) -> dict:
+        inputs = CommandLine.expand(args.inputs)
+        if CommandLine.STDIO in inputs:
+            if len(inputs) > 1:
+                raise ValueError("stdin cannot be mixed with other inputs.")
+            if not args.dict:
+                raise ValueError("--dict is required when decompressing stdin.")
+            data = sys.stdin.buffer.read()
+            with open(args.dict, "r") as df:
+                code_dict = json.load(df)
+            text = Huffman.decode_data(data, code_dict)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            entry = {"input": CommandLine.STDIO, "output": CommandLine.STDIO, "dictionary": args.dict,
+                     "input_bytes": len(data), "output_bytes": len(text.encode())}
+            return {"stdout_data": True, "files": [entry]}
+
+        if args.dict and len(inputs) > 1:
+            raise ValueError("--dict can only be given for a single input.")
+        jobs = [(path, args.dict, args.output_dir, args.force) for path in inputs]
+        return {"files": CommandLine.run_files(CommandLine.decompress_file, jobs, args.workers)}
+
+    @staticmethod
+    def decompress_file(compressed_path: str, dictionary_path: Optional[str],
+                        output_dir: Optional[str], force: bool) -> dict:
+        """Decompresses one file to <name>.txt, refusing to overwrite unless forced."""
+        folder = os.path.dirname(compressed_path)
+        base = os.path.splitext(os.path.basename(compressed_path))[0]
+        dictionary_path = dictionary_path or os.path.join(folder, base + "_dict.json")
+        output_path = os.path.join(output_dir or folder, base + ".txt")
+        if os.path.exists(output_path) and not force:
+            raise ValueError(f"{output_path} already exists (use --force to overwrite it).")
+        Huffman.decode(compressed_path, dictionary_path, output_path)
+        return {"input": compressed_path, "output": output_path, "dictionary": dictionary_path,
+                "input_bytes": os.path.getsize(compressed_path), "output_bytes": os.path.getsize(output_path)}
+
+    @staticmethod
+    def verify(args) -> dict:
+        inputs = CommandLine.expand(args.inputs)
+        if args.dict and len(inputs) > 1:
+            raise ValueError("--dict can only be given for a single input.")
+        jobs = [(path, args.dict) for path in inputs]
+        return {"files": CommandLine.run_files(CommandLine.verify_file, jobs, args.workers)}
+
+    @staticmethod
+    def verify_file(compressed_path: str, dictionary_path: Optional[str]) -> dict:
+        """Verifies one file against <name>_dict.json (or the given dictionary)."""
+        base = os.path.splitext(compressed_path)[0]
+        result = Huffman.verify(compressed_path, dictionary_path or base + "_dict.json")
+        return asdict(result)
+
+    # --------------- Steganography ---------------
+    @staticmethod
+    def hide(args) -> dict:
+        from steganography.BatchSteganography import BatchSteganography
+        from steganography.Steganography import Steganography
+
+        carriers = CommandLine.expand(args.carriers)
+        message = args.message if args.message is not None else sys.stdin.read()
+        entry = {"input": carriers, "output": args.output, "key": args.key,
+                 "message_bytes": len(message.encode())}
+
+        if len(carriers) > 1:
+            manifest = BatchSteganography.hide_message(
+                carriers, message, args.output, args.key, depth=args.depth, seed=args.seed,
+                compress=args.compress, max_workers=args.workers
+            )
+            entry["payload_bytes"] = manifest["length"]
+            entry["parts"] = len(manifest["parts"])
+        elif BatchSteganography.is_audio(carriers[0]):
+            Steganography.hide_message_in_audio(carriers[0], message, args.output, args.key,
+                                                seed=args.seed, depth=args.depth, compress=args.compress)
+        else:
+            Steganography.hide_message_in_image(carriers[0], message, args.output, args.key,
+                                                seed=args.seed, depth=args.depth, compress=args.compress)
+        return {"files": [entry]}
+
+    @staticmethod
+    def extract(args) -> dict:
+        from steganography.BatchSteganography import BatchSteganography
+        from steganography.Steganography import Steganography
+
+        if args.manifest:
+            message = BatchSteganography.extract_message(args.manifest, max_workers=args.workers)
+            entry = {"input": args.manifest}
+        elif args.carrier and args.key:
+            if BatchSteganography.is_audio(args.carrier):
+                message = Steganography.extract_message_from_audio(args.carrier, args.key)
+            else:
+                message = Steganography.extract_message_from_image(args.carrier, args.key)
+            entry = {"input": args.carrier, "key": args.key}
+        else:
+            raise ValueError("Give either a carrier and its --key, or a --manifest.")
+
+        sys.stdout.write(message)
+        sys.stdout.flush()
+        entry["message_bytes"] = len(message.encode())
+        return {"stdout_data": True, "files": [entry]}
+
+    # --------------- Language evaluation ---------------
+    @staticmethod
+    def evaluate(args) -> dict:
+        from evaluator.LanguageEvaluator import LanguageEvaluator
+
+        inputs = CommandLine.expand(args.inputs)
+        results = LanguageEvaluator.evaluate_languages(inputs, max_workers=args.workers)
+        return {"files": [asdict(result) for result in results]}
@@ -1,45 +1,168 @@
 import os
+import threading
+import time
 import tkinter.filedialog as fd
+from concurrent.futures import ThreadPoolExecutor
 
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 
 from huffman.Huffman import Huffman
-from steganography.Steganography import Steganography
-from evaluator.LanguageEvaluator import LanguageEvaluator
+# The steganography and language evaluation engines (and NumPy behind them) are imported
+# by the jobs that use them, to keep the start-up of the window fast. PIL is not deferred:
+# ttkbootstrap imports it along with this module.
+
+
+class JobCancelled(Exception):
+    """Raised inside a background job, from its progress callback, when the user cancels it."""
 
 
 class CompressionApp(ttk.Window):
+    # Delay between two refreshes of the progress bar of a running job, in milliseconds.
+    JOB_POLL_MS = 100
+
     def __init__(self, *args, **kwargs):
         # Initialize the window with a modern theme.
         super().__init__(themename="litera", *args, **kwargs)
         self.title("Huffman encoding / Steganography")
         self.geometry("1000x800")
 
+        # Heavy operations run on a worker thread so that the window stays responsive.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.job = None
+        self.build_job_bar()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
         # Use a Notebook widget to create multiple tabs.
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill='both', expand=True)
 
+        # Tabs are created empty and only built the first time they are selected.
+        self.tab_builders = {}
+
         # Huffman compression UI
-        self.build_compression_form()
-        self.build_decompression_form()
+        self.compress_frame = self.add_tab("Compress", self.build_compression_form)
+        self.decomp_frame = self.add_tab("Decompress", self.build_decompression_form)
 
         # Image steganography UI
-        self.build_steganography_hide_form()
-        self.build_steganography_extract_form()
+        self.hide_frame = self.add_tab("Steganography - Hide", self.build_steganography_hide_form)
+        self.extract_frame = self.add_tab("Steganography - Extract", self.build_steganography_extract_form)
 
         # Audio steganography UI
-        self.build_audio_steganography_hide_form()
-        self.build_audio_steganography_extract_form()
+        self.audio_hide_frame = self.add_tab("Steganography (audio) - Hide",
+                                             self.build_audio_steganography_hide_form)
+        self.audio_extract_frame = self.add_tab("Steganography (audio) - Extract",
+                                                self.build_audio_steganography_extract_form)
 
         # Langage examination UI
-        self.build_language_evaluation_form()
+        self.language_frame = self.add_tab("Language evaluation", self.build_language_evaluation_form)
+
+        self.build_selected_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self.build_selected_tab)
+
+    def add_tab(self, text, builder):
+        frame = ttk.Frame(self.notebook, padding=20)
+        self.notebook.add(frame, text=text)
+        self.tab_builders[str(frame)] = builder
+        return frame
+
+    def build_selected_tab(self, event=None):
+        builder = self.tab_builders.pop(self.notebook.select(), None)
+        if builder is not None:
+            builder()
+
+    # --------------- Background jobs ---------------
+    def build_job_bar(self):
+        self.job_frame = ttk.Frame(self, padding=(20, 5))
+        self.job_frame.pack(side='bottom', fill='x')
+
+        self.job_progress = ttk.Progressbar(self.job_frame, mode='determinate', maximum=1.0)
+        self.job_progress.pack(side='left', fill='x', expand=True, padx=5)
+        self.job_label = ttk.Label(self.job_frame, text="", width=40)
+        self.job_label.pack(side='left', padx=5)
+        self.cancel_button = ttk.Button(
+            self.job_frame, text="Cancel", bootstyle=DANGER, command=self.cancel_job, state=DISABLED
+        )
+        self.cancel_button.pack(side='left', padx=5)
+
+    def run_job(self, work, on_success, status_label, unit="bytes"):
+        """
+        Runs work(progress) on the worker thread and calls on_success(result) on the Tk
+        thread once it is done. Errors and cancellations are shown in status_label.
+
+        work must call progress(done, total) from time to time: it feeds the progress bar
+        and raises JobCancelled once the user has pressed Cancel. Jobs that never call it
+        show an indeterminate bar and cannot be interrupted.
+        """
+        if self.job is not None:
+            status_label.config(text="Another operation is running, please wait or cancel it.", bootstyle="warning")
+            return
+
+        self.job_cancel_event = threading.Event()
+        self.job_state = (0, 0)
+
+        def progress(done, total):
+            if self.job_cancel_event.is_set():
+                raise JobCancelled()
+            self.job_state = (done, total)
+
+        self.job_on_success = on_success
+        self.job_status_label = status_label
+        self.job_unit = unit
+        self.job_started = time.perf_counter()
+        self.job = self.executor.submit(work, progress)
+
+        status_label.config(text="Working...", bootstyle="info")
+        self.cancel_button.config(state=NORMAL)
+        self.job_progress.config(mode='indeterminate', value=0)
+        self.after(self.JOB_POLL_MS, self.poll_job)
+
+    def close(self):
+        # Ask a running job to stop instead of waiting for it to complete.
+        self.cancel_job()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
+    def cancel_job(self):
+        if self.job is not None:
+            self.job_cancel_event.set()
+            self.job_label.config(text="Cancelling...")
+
+    def poll_job(self):
+        # Marshal the progress reported by the worker thread to the widgets.
+        done, total = self.job_state
+        elapsed = time.perf_counter() - self.job_started
+        if total:
+            self.job_progress.config(mode='determinate', value=done / total)
+        else:
+            self.job_progress.step(0.02)
+        rate = done / elapsed if elapsed > 0 else 0
+        if self.job_unit == "bytes":
+            throughput = f"{rate / 1e6:.2f} MB/s"
+        else:
+            throughput = f"{rate:,.0f} {self.job_unit}/s"
+        self.job_label.config(text=f"Elapsed: {elapsed:.1f} s - {throughput}")
+
+        if not self.job.done():
+            self.after(self.JOB_POLL_MS, self.poll_job)
+            return
+
+        job, self.job = self.job, None
+        self.cancel_button.config(state=DISABLED)
+        self.job_progress.config(mode='determinate', value=0)
+        try:
+            result = job.result()
+        except JobCancelled:
+            self.job_status_label.config(text="Operation cancelled.", bootstyle="warning")
+            return
+        except Exception as e:
+            self.job_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
+            return
+        self.job_label.config(text=f"Done in {elapsed:.1f} s")
+        self.job_on_success(result)
 
     # --------------- Compression Tab ---------------
     def build_compression_form(self):
-        self.compress_frame = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.compress_frame, text="Compress")
-
         # Input file selection.
         ttk.Label(self.compress_frame, text="Select Text File:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
         self.file_path_var = ttk.StringVar()
@@ -87,26 +210,25 @@ class CompressionApp(ttk.Window):
         if not filepath:
             self.comp_status_label.config(text="Please select a text file!", bootstyle="danger")
             return
-        try:
-            # Construct output filenames based on the chosen folder.
-            base = os.path.splitext(os.path.basename(filepath))[0]
-            compressed_filepath = os.path.join(out_folder, base + ".huff")
-            dictionary_filepath = os.path.join(out_folder, base + "_dict.json")
 
-            Huffman.compress(filepath, compressed_filepath, dictionary_filepath)
+        # Construct output filenames based on the chosen folder.
+        base = os.path.splitext(os.path.basename(filepath))[0]
+        compressed_filepath = os.path.join(out_folder, base + ".huff")
+        dictionary_filepath = os.path.join(out_folder, base + "_dict.json")
+
+        def work(progress):
+            Huffman.compress(filepath, compressed_filepath, dictionary_filepath, progress=progress)
 
+        def done(_):
             self.comp_status_label.config(
                 text=f"File compressed:\n{compressed_filepath}\nDictionary saved at:\n{dictionary_filepath}",
                 bootstyle="success"
             )
-        except Exception as e:
-            self.comp_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
+
+        self.run_job(work, done, self.comp_status_label, unit="characters")
 
     # --------------- Decompression Tab ---------------
     def build_decompression_form(self):
-        self.decomp_frame = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.decomp_frame, text="Decompress")
-
         # Compressed file input.
         ttk.Label(self.decomp_frame, text="Compressed File:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
         self.comp_file_var = ttk.StringVar()
@@ -174,20 +296,19 @@ class CompressionApp(ttk.Window):
             self.decomp_status_label.config(text="Please select all three inputs!", bootstyle="danger")
             return
 
-        try:
-            Huffman.decode(comp_filepath, dict_filepath, output_filepath)
+        def work(progress):
+            Huffman.decode(comp_filepath, dict_filepath, output_filepath, progress=progress)
+
+        def done(_):
             self.decomp_status_label.config(
                 text=f"File decompressed successfully and saved to:\n{output_filepath}",
                 bootstyle="success"
             )
-        except Exception as e:
-            self.decomp_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
+
+        self.run_job(work, done, self.decomp_status_label)
 
     # --------------- Steganography Hide Tab ---------------
     def build_steganography_hide_form(self):
-        self.hide_frame = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.hide_frame, text="Steganography - Hide")
-
         # PNG image file selection.
         ttk.Label(self.hide_frame, text="Select PNG Image File:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
         self.stego_image_var = ttk.StringVar()
@@ -223,15 +344,21 @@ class CompressionApp(ttk.Window):
         )
         self.browse_out_pixels_button.grid(row=3, column=2, padx=5, pady=5)
 
+        # Huffman compression of the message.
+        self.hide_compress_var = ttk.BooleanVar()
+        ttk.Checkbutton(
+            self.hide_frame, text="Compress message (Huffman)", variable=self.hide_compress_var
+        ).grid(row=4, column=1, sticky='w', padx=5, pady=5)
+
         # Submit button.
         self.hide_submit_button = ttk.Button(
             self.hide_frame, text="Hide Message", bootstyle=SUCCESS, command=self.hide_message_in_image
         )
-        self.hide_submit_button.grid(row=4, column=1, pady=10)
+        self.hide_submit_button.grid(row=5, column=1, pady=10)
 
         # Status label.
         self.hide_status_label = ttk.Label(self.hide_frame, text="")
-        self.hide_status_label.grid(row=5, column=0, columnspan=3, pady=5)
+        self.hide_status_label.grid(row=6, column=0, columnspan=3, pady=5)
 
     def browse_stego_image(self):
         filetypes = (("PNG files", "*.png"), ("All files", "*.*"))
@@ -247,28 +374,32 @@ class CompressionApp(ttk.Window):
 
     def browse_out_pixels(self):
         filename = fd.asksaveasfilename(title="Output Pixel Numbers File", initialdir=os.getcwd(),
-                                         defaultextension=".txt", filetypes=(("Text files", "*.txt"), ("All files", "*.*")))
+                                         defaultextension=".key", filetypes=(("Key files", "*.key"), ("All files", "*.*")))
         if filename:
             self.out_pixels_var.set(filename)
 
     def hide_message_in_image(self):
-        try:
+        arguments = dict(
+            png_image_file_path=self.stego_image_var.get(),
+            secret_message=self.stego_text_message.get(),
+            output_image_path=self.out_stego_image_var.get(),
+            pixel_numbers_file_path=self.out_pixels_var.get(),
+            compress=self.hide_compress_var.get()
+        )
+
+        def work(progress):
+            from steganography.Steganography import Steganography
+
             # Call the function to hide the message in the image
-            Steganography.hide_message_in_image(
-                png_image_file_path=self.stego_image_var.get(),
-                secret_message=self.stego_text_message.get(),
-                output_image_path=self.out_stego_image_var.get(),
-                pixel_numbers_file_path=self.out_pixels_var.get()
-            )
+            Steganography.hide_message_in_image(**arguments, progress=progress)
+
+        def done(_):
             self.hide_status_label.config(text="Message hidden successfully.", bootstyle="success")
-        except Exception as e:
-            self.hide_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
+
+        self.run_job(work, done, self.hide_status_label)
 
     # --------------- Steganography Extract Tab ---------------
     def build_steganography_extract_form(self):
-        self.extract_frame = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.extract_frame, text="Steganography - Extract")
-
         # PNG image file selection.
         ttk.Label(self.extract_frame, text="Select PNG Image File:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
         self.extract_image_var = ttk.StringVar()
@@ -311,30 +442,35 @@ class CompressionApp(ttk.Window):
             self.extract_image_var.set(filename)
 
     def browse_extract_pixels(self):
-        filetypes = (("Text files", "*.txt"), ("All files", "*.*"))
+        filetypes = (("Key files", "*.key"), ("Text files", "*.txt"), ("All files", "*.*"))
         filename = fd.askopenfilename(title="Select Pixel Numbers File", initialdir=os.getcwd(), filetypes=filetypes)
         if filename:
             self.extract_pixels_var.set(filename)
 
     def extract_message_from_image(self):
-        try:
+        image_path = self.extract_image_var.get()
+        pixels_path = self.extract_pixels_var.get()
+
+        def work(progress):
+            from steganography.Steganography import Steganography
+
             # Call the extract function with the image path and pixel indices file.
-            hidden_message = Steganography.extract_message_from_image(
-                png_image_file_path=self.extract_image_var.get(),
-                pixel_numbers_file_path=self.extract_pixels_var.get()
+            return Steganography.extract_message_from_image(
+                png_image_file_path=image_path,
+                pixel_numbers_file_path=pixels_path,
+                progress=progress
             )
+
+        def done(hidden_message):
             # Display the hidden message in the entry widget.
             self.hidden_message_text.delete(0, 'end')
             self.hidden_message_text.insert(0, hidden_message)
             self.extract_status_label.config(text="Message extracted successfully.", bootstyle="success")
-        except Exception as e:
-            self.extract_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
+
+        self.run_job(work, done, self.extract_status_label)
 
     # --------------- Audio Steganography Hide Tab ---------------
     def build_audio_steganography_hide_form(self):
-        self.audio_hide_frame = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.audio_hide_frame, text="Steganography (audio) - Hide")
-
         # WAV audio file selection.
         ttk.Label(self.audio_hide_frame, text="Select WAV Image File:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
         self.stego_audio_var = ttk.StringVar()
@@ -370,15 +506,21 @@ class CompressionApp(ttk.Window):
         )
         self.audio_browse_out_pixels_button.grid(row=3, column=2, padx=5, pady=5)
 
+        # Huffman compression of the message.
+        self.audio_hide_compress_var = ttk.BooleanVar()
+        ttk.Checkbutton(
+            self.audio_hide_frame, text="Compress message (Huffman)", variable=self.audio_hide_compress_var
+        ).grid(row=4, column=1, sticky='w', padx=5, pady=5)
+
         # Submit button.
         self.audio_hide_submit_button = ttk.Button(
             self.audio_hide_frame, text="Hide Message", bootstyle=SUCCESS, command=self.hide_message_in_audio
         )
-        self.audio_hide_submit_button.grid(row=4, column=1, pady=10)
+        self.audio_hide_submit_button.grid(row=5, column=1, pady=10)
 
         # Status label.
         self.audio_hide_status_label = ttk.Label(self.audio_hide_frame, text="")
-        self.audio_hide_status_label.grid(row=5, column=0, columnspan=3, pady=5)
+        self.audio_hide_status_label.grid(row=6, column=0, columnspan=3, pady=5)
 
     def browse_stego_audio(self):
         filetypes = (("WAV files", "*.wav"), ("All files", "*.*"))
@@ -394,28 +536,32 @@ class CompressionApp(ttk.Window):
 
     def browse_out_samples(self):
         filename = fd.asksaveasfilename(title="Output Sample Numbers File", initialdir=os.getcwd(),
-                                         defaultextension=".txt", filetypes=(("Text files", "*.txt"), ("All files", "*.*")))
+                                         defaultextension=".key", filetypes=(("Key files", "*.key"), ("All files", "*.*")))
         if filename:
             self.audio_out_samples_var.set(filename)
 
     def hide_message_in_audio(self):
-        try:
+        arguments = dict(
+            wav_audio_file_path=self.stego_audio_var.get(),
+            secret_message=self.audio_stego_text_message.get(),
+            output_audio_file_path=self.out_stego_audio_var.get(),
+            sample_numbers_file_path=self.audio_out_samples_var.get(),
+            compress=self.audio_hide_compress_var.get()
+        )
+
+        def work(progress):
+            from steganography.Steganography import Steganography
+
             # Call the function to hide the message in the audio
-            Steganography.hide_message_in_audio(
-                wav_audio_file_path=self.stego_audio_var.get(),
-                secret_message=self.audio_stego_text_message.get(),
-                output_audio_file_path=self.out_stego_audio_var.get(),
-                sample_numbers_file_path=self.audio_out_samples_var.get()
-            )
+            Steganography.hide_message_in_audio(**arguments, progress=progress)
+
+        def done(_):
             self.audio_hide_status_label.config(text="Message hidden successfully.", bootstyle="success")
-        except Exception as e:
-            self.audio_hide_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
+
+        self.run_job(work, done, self.audio_hide_status_label, unit="frames")
 
     # --------------- Audio Steganography Extract Tab ---------------
     def build_audio_steganography_extract_form(self):
-        self.audio_extract_frame = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.audio_extract_frame, text="Steganography (audio) - Extract")
-
         # WAV audio file selection.
         ttk.Label(self.audio_extract_frame, text="Select WAV Audio File:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
         self.extract_audio_var = ttk.StringVar()
@@ -458,30 +604,35 @@ class CompressionApp(ttk.Window):
             self.extract_audio_var.set(filename)
 
     def browse_extract_samples(self):
-        filetypes = (("Text files", "*.txt"), ("All files", "*.*"))
+        filetypes = (("Key files", "*.key"), ("Text files", "*.txt"), ("All files", "*.*"))
         filename = fd.askopenfilename(title="Select Sample Numbers File", initialdir=os.getcwd(), filetypes=filetypes)
         if filename:
             self.extract_samples_var.set(filename)
 
     def extract_message_from_audio(self):
-        try:
+        audio_path = self.extract_audio_var.get()
+        samples_path = self.extract_samples_var.get()
+
+        def work(progress):
+            from steganography.Steganography import Steganography
+
             # Call the extract function with the audio path and samples indices file.
-            hidden_message = Steganography.extract_message_from_audio(
-                wav_audio_file_path=self.extract_audio_var.get(),
-                sample_numbers_file_path=self.extract_samples_var.get()
+            return Steganography.extract_message_from_audio(
+                wav_audio_file_path=audio_path,
+                sample_numbers_file_path=samples_path,
+                progress=progress
             )
+
+        def done(hidden_message):
             # Display the hidden message in the entry widget.
             self.audio_hidden_message_text.delete(0, 'end')
             self.audio_hidden_message_text.insert(0, hidden_message)
             self.audio_extract_status_label.config(text="Message extracted successfully.", bootstyle="success")
-        except Exception as e:
-            self.audio_extract_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
+
+        self.run_job(work, done, self.audio_extract_status_label, unit="samples")
 
     # --------------- Language Evaluation Tab ---------------
     def build_language_evaluation_form(self):
-        self.language_frame = ttk.Frame(self.notebook, padding=20)
-        self.notebook.add(self.language_frame, text="Language evaluation")
-
         # Language characters list file input
         ttk.Label(self.language_frame, text="Language Characters List File:").grid(row=1, column=0, sticky='w', padx=5, pady=5)
         self.language_file_var = ttk.StringVar()
@@ -511,11 +662,15 @@ class CompressionApp(ttk.Window):
     def evaluate_language_file(self):
         language_file = self.language_file_var.get()
         if not language_file:
-            self.comp_status_label.config(text="Please select a language characters list JSON file!", bootstyle="danger")
+            self.language_status_label.config(text="Please select a language characters list JSON file!", bootstyle="danger")
             return
-        try:
-            is_valid_code = LanguageEvaluator.evaluate_language(language_file)
 
+        def work(progress):
+            from evaluator.LanguageEvaluator import LanguageEvaluator
+
+            return LanguageEvaluator.evaluate_language(language_file, progress=progress)
+
+        def done(is_valid_code):
             if is_valid_code:
                 self.language_status_label.config(
                     text=f"The language is a valid code!",
@@ -526,9 +681,8 @@ class CompressionApp(ttk.Window):
                     text=f"The language is not a valid code!",
                     bootstyle="danger"
                 )
-        except Exception as e:
-            self.language_status_label.config(text=f"Error: {str(e)}", bootstyle="danger")
 
+        self.run_job(work, done, self.language_status_label, unit="suffixes")
 
 if __name__ == "__main__":
     app = CompressionApp()
@@ -1,9 +1,86 @@
+import bisect
+import hashlib
+import io
 import json
+import operator
+import re
+import struct
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
 
 from huffman.Node import Node
 
 
+class CorruptBlockError(ValueError):
+    """Raised when a block of the interleaved block format cannot be decoded or fails its checksum."""
+
+    def __init__(self, block, problem="is corrupted"):
+        super().__init__(f"Block {block} {problem}.")
+        self.block = block
+
+
+@dataclass
+class VerificationResult:
+    """
+    Outcome of Huffman.verify.
+
+    ok is True when the archive decodes cleanly and all the checksums it records match,
+    False when it is corrupted, and None when it decodes cleanly but records no checksum
+    (plain format, or block format written without checksum), so that its content could
+    not actually be checked. For a corrupted archive, error describes the problem and
+    block is the index of the first bad block (None when the problem is not local to a
+    block).
+    """
+    source: str
+    ok: Optional[bool]
+    format: str = "unknown"
+    checksummed: bool = False
+    blocks: int = 0
+    symbols: int = 0
+    text_bytes: int = 0
+    digest: Optional[str] = None
+    block: Optional[int] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
 class Huffman:
+    # Number of characters (or bytes) processed between two progress reports.
+    PROGRESS_STEP = 1 << 16
+
+    # Symbol alphabets of Huffman.tokenize.
+    ALPHABETS = ("char", "digram", "word")
+    DIGRAM_COUNT = 256
+    WORD_COUNT = 4096
+    WORD_MIN_COUNT = 2
+
+    # Interleaved block format, written by Huffman.compress when streams is given.
+    # A legacy file starts with its number of valid bits (0 to 8), never with 0xFF.
+    BLOCK_MAGIC = b"\xffHB"
+    BLOCK_VERSION = 1
+    # Version 2 adds a SHA-256 digest of the whole text after the file header and the
+    # CRC32 of each block's text after the block.
+    BLOCK_CHECKSUM_VERSION = 2
+    BLOCK_DIGEST_SIZE = 32
+    BLOCK_CRC_FIELD = struct.Struct("<I")
+    # File header: magic, version, number of streams per block, symbols per block.
+    BLOCK_FILE_HEADER = struct.Struct("<3sBBI")
+    # Number of symbols in each block, then the byte length of each stream (jump table).
+    BLOCK_COUNT_FIELD = struct.Struct("<I")
+    BLOCK_SYMBOLS = 1 << 16
+    DEFAULT_STREAMS = 4
+    # Longest code handled by the table-driven decoder; longer codes are decoded bit by bit.
+    TABLE_BITS = 20
+    # Below this number of lanes (streams times blocks), lockstep decoding is not worth it.
+    MIN_LOCKSTEP_LANES = 16
+    # Number of lanes decoded together by Huffman.verify, which bounds its memory use.
+    VERIFY_LANES = 256
+    # Size of the chunks read by Huffman.verify from plain files.
+    VERIFY_READ_SIZE = 1 << 16
+
     @staticmethod
     def count_characters(text):
         """
@@ -21,6 +98,73 @@ class Huffman:
         # Create a list of tuples and sort it by count, then by character
         return sorted(counts.items(), key=lambda x: (x[1], x[0]))
 
+    @staticmethod
+    def count_symbols(symbols):
+        """
+        Counts the frequency of each symbol of a tokenized text.
+        Returns a list of (symbol, count) tuples sorted in ascending order by count,
+        then by symbol.
+        """
+        return sorted(Counter(symbols).items(), key=lambda x: (x[1], x[0]))
+
+    @staticmethod
+    def tokenize(text, alphabet="char"):
+        """
+        Cuts a text into the symbols that are Huffman-encoded. Only letters a-z and spaces
+        are kept, as by count_characters.
+
+        Alphabets:
+          - "char":   one symbol per character.
+          - "digram": the DIGRAM_COUNT most frequent pairs of characters are symbols of
+                      their own; the text is cut greedily from left to right.
+          - "word":   a word and the space following it form one symbol when it is among
+                      the WORD_COUNT most frequent ones and occurs at least WORD_MIN_COUNT
+                      times; other words are spelled out character by character (escape).
+
+        Symbols are plain strings, so decoding is the same for every alphabet: the decoded
+        symbols are concatenated.
+
+        :param text: The lower-cased text.
+        :param alphabet: "char", "digram" or "word".
+        :return: The sequence of symbols.
+        """
+        text = re.sub(r"[^a-z ]+", "", text)
+        if alphabet == "char":
+            return text
+
+        if alphabet == "digram":
+            counts = Counter(map(operator.add, text, text[1:]))
+            digrams = set(sorted(counts, key=lambda digram: (-counts[digram], digram))[:Huffman.DIGRAM_COUNT])
+            symbols = []
+            i = 0
+            length = len(text)
+            while i < length:
+                pair = text[i:i + 2]
+                if pair in digrams:
+                    symbols.append(pair)
+                    i += 2
+                else:
+                    symbols.append(text[i])
+                    i += 1
+            return symbols
+
+        if alphabet == "word":
+            words = re.findall(r"[a-z]+ ?| ", text)
+            counts = {}
+            for word in words:
+                counts[word] = counts.get(word, 0) + 1
+            kept = set(sorted((word for word in counts if counts[word] >= Huffman.WORD_MIN_COUNT),
+                              key=lambda word: (-counts[word], word))[:Huffman.WORD_COUNT])
+            symbols = []
+            for word in words:
+                if word in kept:
+                    symbols.append(word)
+                else:
+                    symbols.extend(word)
+            return symbols
+
+        raise ValueError(f"Unknown alphabet {alphabet!r}.")
+
     @staticmethod
     def make_tree(sorted_counts):
         """
@@ -48,9 +192,8 @@ class Huffman:
             right = nodes.pop(0)
             # Create a new internal node with the combined frequency.
             new_node = Node(letter=None, freq=left.freq + right.freq, left=left, right=right)
-            # Insert the new node and keep the list sorted.
-            nodes.append(new_node)
-            nodes.sort(key=lambda node: node.freq)
+            # Insert the new node and keep the list sorted (after the nodes of equal frequency).
+            bisect.insort(nodes, new_node, key=lambda node: node.freq)
 
         # Step 3: The last remaining node is the root of the Huffman tree.
         return nodes[0]
@@ -83,40 +226,141 @@ class Huffman:
         return code_dict
 
     @staticmethod
-    def compress(file_path, compressed_filename, dictionary_filename):
+    def canonical_codes(code_lengths):
         """
-        Compresses the given text file using Huffman encoding and outputs two files:
-          - A binary file containing the encoded text.
-          - A JSON file containing the encoding dictionary.
+        Assigns canonical Huffman codes from code lengths: symbols are sorted by
+        (length, symbol) and receive consecutive binary values, shifted left whenever the
+        length grows. Only the lengths need to be stored to rebuild the same codes.
 
-        Instead of padding the encoded bit string to a multiple of 8, this function writes a header byte
-        indicating the number of valid bits in the final data byte.
+        :param code_lengths: A dictionary mapping symbols to their code length.
+        :return: A dictionary mapping symbols to their binary code strings.
+        """
+        code_dict = {}
+        code = 0
+        previous_length = 0
+        for symbol, length in sorted(code_lengths.items(), key=lambda x: (x[1], x[0])):
+            code <<= length - previous_length
+            code_dict[symbol] = format(code, f"0{length}b")
+            code += 1
+            previous_length = length
+        return code_dict
 
-        :param file_path: Path to the original text file.
-        :param compressed_filename: Path for the output compressed binary file.
-        :param dictionary_filename: Path for the output encoding dictionary (JSON file).
+    @staticmethod
+    def pack_payload(data: bytes) -> bytes:
         """
+        Huffman-encodes arbitrary bytes into a self-contained blob, used to shrink hidden
+        messages.
 
-        # 0. Read the file's content in lower case to make it case insensitive
-        text = ""
-        with open(file_path, 'r') as f:
-            text = f.read().lower()
+        Unlike compress, every byte value is kept. The blob holds:
+          - 1 byte: number of distinct symbols minus one.
+          - 2 bytes per symbol: the symbol and its code length (canonical code table).
+          - 4 bytes: number of encoded symbols, so that padding bits are ignored.
+          - The encoded bits, packed most significant bit first.
 
-        # 1. Count frequencies and build a sorted list.
-        sorted_counts = Huffman.count_characters(text)
+        :param data: The bytes to encode.
+        :return: The encoded blob (empty for empty data).
+        """
+        if not data:
+            return b""
 
-        # 2. Build the Huffman tree.
-        root = Huffman.make_tree(sorted_counts)
+        # 1. Build the Huffman tree over byte values and keep only the code lengths.
+        counts = {}
+        for byte in data:
+            counts[byte] = counts.get(byte, 0) + 1
+        root = Huffman.make_tree(sorted(counts.items(), key=lambda x: (x[1], x[0])))
+        tree_codes = Huffman.tree_to_dict(root)
+        # A single distinct symbol still needs a 1-bit code.
+        code_lengths = {symbol: max(1, len(code)) for symbol, code in tree_codes.items()}
+
+        # 2. Write the canonical code table.
+        code_dict = Huffman.canonical_codes(code_lengths)
+        header = bytearray([len(code_dict) - 1])
+        for symbol, length in sorted(code_lengths.items(), key=lambda x: (x[1], x[0])):
+            header += bytes([symbol, length])
+        header += len(data).to_bytes(4, byteorder="big")
+
+        # 3. Encode and pack the bits.
+        codes = [code_dict.get(byte, "") for byte in range(256)]
+        encoded_str = "".join(codes[byte] for byte in data)
+        padding = -len(encoded_str) % 8
+        packed = int(encoded_str + "0" * padding, 2).to_bytes((len(encoded_str) + padding) // 8, byteorder="big")
+        return bytes(header) + packed
 
-        # 3. Get the encoding dictionary.
-        code_dict = Huffman.tree_to_dict(root)
+    @staticmethod
+    def unpack_payload(blob: bytes) -> bytes:
+        """
+        Decodes a blob produced by pack_payload.
+
+        :param blob: The encoded blob.
+        :return: The original bytes.
+        """
+        if not blob:
+            return b""
+
+        # 1. Rebuild the canonical code table.
+        symbol_count = blob[0] + 1
+        table_end = 1 + 2 * symbol_count
+        code_lengths = {blob[i]: blob[i + 1] for i in range(1, table_end, 2)}
+        reverse_dict = {code: symbol for symbol, code in Huffman.canonical_codes(code_lengths).items()}
+        length = int.from_bytes(blob[table_end:table_end + 4], byteorder="big")
+        data = blob[table_end + 4:]
+
+        # 2. Decode the bits until the recorded number of symbols is reached.
+        encoded_str = format(int.from_bytes(data, byteorder="big"), f"0{len(data) * 8}b") if data else ""
+        decoded = bytearray()
+        current_code = ""
+        for bit in encoded_str:
+            current_code += bit
+            if current_code in reverse_dict:
+                decoded.append(reverse_dict[current_code])
+                current_code = ""
+                if len(decoded) == length:
+                    break
+
+        if len(decoded) != length:
+            raise ValueError("Huffman payload is truncated.")
+        return bytes(decoded)
+
+    @staticmethod
+    def encode_text(text, progress=None, streams=None, alphabet="char", checksum=False):
+        """
+        Huffman-encodes a text in memory, in the format written by Huffman.compress.
+
+        :param text: The text to encode; it is lower-cased and only letters a-z and
+                     spaces are kept.
+        :param progress: Optional callback receiving (symbols_encoded, total_symbols).
+        :param streams: Number of interleaved streams per block (see Huffman.encode_blocks),
+                        or None for the plain single stream.
+        :param alphabet: The symbols encoded, see Huffman.tokenize.
+        :param checksum: Whether to record checksums (see Huffman.encode_blocks); this
+                         implies the block format, with DEFAULT_STREAMS streams unless
+                         streams is given.
+        :return: A tuple (data, code_dict): the encoded bytes and the encoding dictionary.
+        """
+        # 1. Cut the text into symbols, count them and build a sorted list.
+        symbols = Huffman.tokenize(text.lower(), alphabet)
+        sorted_counts = Huffman.count_symbols(symbols)
+
+        # 2. Build the Huffman tree (there is none for a text without any letter or space).
+        root = Huffman.make_tree(sorted_counts) if sorted_counts else None
+
+        # 3. Get the encoding dictionary, empty without symbols. A single distinct symbol
+        #    still needs a 1-bit code.
+        code_dict = Huffman.tree_to_dict(root) if root is not None else {}
+        if len(code_dict) == 1:
+            code_dict = {symbol: "0" for symbol in code_dict}
+        if checksum and streams is None:
+            streams = Huffman.DEFAULT_STREAMS
+        if streams is not None:
+            return Huffman.encode_blocks(symbols, code_dict, streams, progress, checksum), code_dict
 
         # 4. Build the encoded bit string.
-        encoded_str = ""
-        for ch in text:
-            if ch in code_dict:
-                encoded_str += code_dict[ch]
-            # You may choose to handle characters not present in code_dict here.
+        encoded_parts = []
+        for start in range(0, len(symbols), Huffman.PROGRESS_STEP):
+            encoded_parts.extend([code_dict[symbol] for symbol in symbols[start:start + Huffman.PROGRESS_STEP]])
+            if progress is not None:
+                progress(min(start + Huffman.PROGRESS_STEP, len(symbols)), len(symbols))
+        encoded_str = "".join(encoded_parts)
 
         # 5. Pack the bit string into bytes WITHOUT extra padding.
         # Determine how many full bytes we have and the number of valid bits in the last byte.
@@ -126,77 +370,546 @@ class Huffman:
         if len(encoded_str) > 0 and remainder == 0:
             remainder = 8
 
-        b_array = bytearray()
+        # First byte: number of valid bits in the final data byte.
+        b_array = bytearray([remainder])
         # Process full bytes
         for i in range(0, full_bytes * 8, 8):
             byte = encoded_str[i:i + 8]
             b_array.append(int(byte, 2))
-        # Process the final partial byte, if any.
-        if remainder < 8:
+        # Process the final partial byte, if any (an empty text is the header byte 0 alone).
+        if 0 < remainder < 8:
             last_bits = encoded_str[full_bytes * 8:]
             # Convert the remaining bits to an integer (they are not padded)
             last_byte = int(last_bits, 2)
             b_array.append(last_byte)
 
-        # 6. Write the binary file.
-        # First byte: number of valid bits in the final data byte.
+        return bytes(b_array), code_dict
+
+    @staticmethod
+    def decode_data(data, code_dict, progress=None):
+        """
+        Decodes, in memory, the content of a file written by Huffman.compress.
+
+        :param data: The compressed bytes, header byte included.
+        :param code_dict: The encoding dictionary (letter -> code).
+        :param progress: Optional callback receiving (bytes_decoded, total_bytes).
+        :return: The decoded text.
+        """
+        if data.startswith(Huffman.BLOCK_MAGIC):
+            return Huffman.decode_blocks(data, code_dict, progress)
+
+        reverse_dict = {v: k for k, v in code_dict.items()}
+
+        # 1. Split the header (number of valid bits in the final byte) from the data.
+        valid_bits = data[0] if data else 0
+        data = data[1:]
+
+        # 2. Convert the byte data into a bit string.
+        encoded_str = ""
+        if len(data) > 0:
+            # Process all full bytes.
+            encoded_str = "".join(format(byte, "08b") for byte in data[:-1])
+            # Process the last byte using only the valid bits (compress stores them unpadded,
+            # in the low-order bits).
+            last_byte = data[-1]
+            last_bits = format(last_byte, "08b")[8 - valid_bits:]
+            encoded_str += last_bits
+
+        # 3. Decode the bit string.
+        decoded_parts = []
+        current_code = ""
+        step = Huffman.PROGRESS_STEP * 8
+        for start in range(0, len(encoded_str), step):
+            for bit in encoded_str[start:start + step]:
+                current_code += bit
+                if current_code in reverse_dict:
+                    decoded_parts.append(reverse_dict[current_code])
+                    current_code = ""
+            if progress is not None:
+                progress(min(start + step, len(encoded_str)) // 8, len(data))
+        return "".join(decoded_parts)
+
+    @staticmethod
+    def encode_blocks(symbols, code_dict, streams=DEFAULT_STREAMS, progress=None, checksum=False):
+        """
+        Encodes symbols in the interleaved block format.
+
+        The symbols are cut into blocks of BLOCK_SYMBOLS symbols. Inside a block, symbol i
+        goes to stream i % streams, and every stream is a separate bit string padded to a
+        whole byte. A block is written as its symbol count, the byte length of each of its
+        streams, then the streams one after the other. As no stream depends on where
+        another one ends, a decoder can advance all of them in lockstep.
+
+        With checksum, the file is written as version 2: the file header is followed by
+        the SHA-256 digest of the whole text, and every block by the CRC32 of its text.
+
+        :param symbols: The sequence of symbols to encode; all must be in code_dict.
+        :param code_dict: The encoding dictionary (symbol -> code).
+        :param streams: Number of streams per block (1 to 255).
+        :param progress: Optional callback receiving (symbols_encoded, total_symbols).
+        :param checksum: Whether to record the checksums.
+        :return: The encoded bytes, file header included.
+        """
+        if not 1 <= streams <= 255:
+            raise ValueError("The number of streams must be between 1 and 255.")
+
+        version = Huffman.BLOCK_CHECKSUM_VERSION if checksum else Huffman.BLOCK_VERSION
+        out = bytearray(Huffman.BLOCK_FILE_HEADER.pack(Huffman.BLOCK_MAGIC, version, streams, Huffman.BLOCK_SYMBOLS))
+        if checksum:
+            out += hashlib.sha256("".join(symbols).encode()).digest()
+        jump_table = struct.Struct(f"<{streams}I")
+        for start in range(0, len(symbols), Huffman.BLOCK_SYMBOLS):
+            block = symbols[start:start + Huffman.BLOCK_SYMBOLS]
+            packed = []
+            for s in range(streams):
+                encoded_str = "".join([code_dict[symbol] for symbol in block[s::streams]])
+                padding = -len(encoded_str) % 8
+                packed.append(int(encoded_str + "0" * padding, 2).to_bytes((len(encoded_str) + padding) // 8,
+                                                                           byteorder="big")
+                              if encoded_str else b"")
+            out += Huffman.BLOCK_COUNT_FIELD.pack(len(block))
+            out += jump_table.pack(*(len(stream) for stream in packed))
+            out += b"".join(packed)
+            if checksum:
+                out += Huffman.BLOCK_CRC_FIELD.pack(zlib.crc32("".join(block).encode()))
+            if progress is not None:
+                progress(start + len(block), len(symbols))
+        return bytes(out)
+
+    @staticmethod
+    def read_block_header(f):
+        """
+        Reads the file header of the interleaved block format.
+
+        :param f: A binary file positioned at the start of the data.
+        :return: A tuple (version, streams, block_symbols, digest); digest is the SHA-256
+                 of the whole text for version 2, None for version 1.
+        """
+        header = f.read(Huffman.BLOCK_FILE_HEADER.size)
+        if len(header) < Huffman.BLOCK_FILE_HEADER.size:
+            raise ValueError("Unsupported compressed file format.")
+        magic, version, streams, block_symbols = Huffman.BLOCK_FILE_HEADER.unpack(header)
+        if (magic != Huffman.BLOCK_MAGIC or streams == 0
+                or version not in (Huffman.BLOCK_VERSION, Huffman.BLOCK_CHECKSUM_VERSION)):
+            raise ValueError("Unsupported compressed file format.")
+
+        digest = None
+        if version == Huffman.BLOCK_CHECKSUM_VERSION:
+            digest = f.read(Huffman.BLOCK_DIGEST_SIZE)
+            if len(digest) < Huffman.BLOCK_DIGEST_SIZE:
+                raise ValueError("The file header is truncated.")
+        return version, streams, block_symbols, digest
+
+    @staticmethod
+    def iter_blocks(f, version, streams, block_symbols):
+        """
+        Reads the blocks following the file header one at a time.
+
+        :param f: A binary file positioned after the file header.
+        :return: A generator of (count, payload, lengths, crc) tuples: the symbol count,
+                 the bytes of the streams, the byte length of each stream and the CRC32 of
+                 the block's text (None for version 1).
+        """
+        jump_table = struct.Struct(f"<{streams}I")
+        # A damaged jump table must not make the reader allocate more than the file holds.
+        position = f.tell()
+        end = f.seek(0, io.SEEK_END)
+        f.seek(position)
+        index = 0
+        while True:
+            header = f.read(Huffman.BLOCK_COUNT_FIELD.size + jump_table.size)
+            if not header:
+                return
+            if len(header) < Huffman.BLOCK_COUNT_FIELD.size + jump_table.size:
+                raise CorruptBlockError(index, "is truncated")
+            (count,) = Huffman.BLOCK_COUNT_FIELD.unpack_from(header)
+            lengths = jump_table.unpack_from(header, Huffman.BLOCK_COUNT_FIELD.size)
+            if count > block_symbols:
+                raise CorruptBlockError(index)
+
+            if f.tell() + sum(lengths) > end:
+                raise CorruptBlockError(index, "is truncated")
+            payload = f.read(sum(lengths))
+            crc = None
+            if version == Huffman.BLOCK_CHECKSUM_VERSION:
+                crc_field = f.read(Huffman.BLOCK_CRC_FIELD.size)
+                if len(crc_field) < Huffman.BLOCK_CRC_FIELD.size:
+                    raise CorruptBlockError(index, "is truncated")
+                (crc,) = Huffman.BLOCK_CRC_FIELD.unpack(crc_field)
+            yield count, payload, lengths, crc
+            index += 1
+
+    @staticmethod
+    def join_blocks(group):
+        """
+        Concatenates the streams of consecutive blocks read by Huffman.iter_blocks.
+
+        :return: A tuple (data, blocks) where blocks lists, for each block, its symbol count
+                 and the (offset, length) in data of each of its streams.
+        """
+        blocks = []
+        offset = 0
+        for count, _, lengths, _ in group:
+            spans = []
+            for length in lengths:
+                spans.append((offset, length))
+                offset += length
+            blocks.append((count, spans))
+        return b"".join(payload for _, payload, _, _ in group), blocks
+
+    @staticmethod
+    def decode_blocks(data, code_dict, progress=None):
+        """
+        Decodes the interleaved block format, checking the checksums of version 2.
+
+        :param data: The encoded bytes, file header included.
+        :param code_dict: The encoding dictionary (symbol -> code).
+        :param progress: Optional callback receiving (bytes_decoded, total_bytes), the
+                         lane decoders' own units (steps or blocks) being scaled to the
+                         size of data.
+        :return: The decoded text.
+        """
+        f = io.BytesIO(data)
+        version, streams, block_symbols, digest = Huffman.read_block_header(f)
+        group = list(Huffman.iter_blocks(f, version, streams, block_symbols))
+        scaled = None
+        if progress is not None:
+            def scaled(done, total):
+                progress(done * len(data) // total if total else len(data), len(data))
+        texts = Huffman.decode_block_group(group, code_dict, streams, progress=scaled)
+
+        if digest is not None:
+            for index, (text, (_, _, _, crc)) in enumerate(zip(texts, group)):
+                if zlib.crc32(text.encode()) != crc:
+                    raise CorruptBlockError(index, "failed its checksum")
+            if hashlib.sha256("".join(texts).encode()).digest() != digest:
+                raise ValueError("The decoded text does not match the file digest.")
+        return "".join(texts)
+
+    @staticmethod
+    def decode_block_group(group, code_dict, streams, first_block=0, progress=None):
+        """
+        Decodes consecutive blocks read by Huffman.iter_blocks.
+
+        Every stream of every block is an independent lane. When there are at least
+        MIN_LOCKSTEP_LANES lanes, they are decoded in lockstep by
+        Huffman.decode_lanes_in_lockstep; otherwise, or for codes longer than TABLE_BITS
+        (or no codes at all), one after the other by Huffman.decode_lanes_serially.
+
+        :param first_block: Index of the first block of the group, for error messages.
+        :return: The decoded text of each block.
+        """
+        max_length = max((len(code) for code in code_dict.values()), default=0)
+
+        data, blocks = Huffman.join_blocks(group)
+        if not 0 < max_length <= Huffman.TABLE_BITS or streams * len(blocks) < Huffman.MIN_LOCKSTEP_LANES:
+            return Huffman.decode_lanes_serially(data, code_dict, streams, blocks, progress, first_block)
+        return Huffman.decode_lanes_in_lockstep(data, code_dict, streams, blocks, progress, first_block)
+
+    @staticmethod
+    def decode_lanes_in_lockstep(data, code_dict, streams, blocks, progress=None, first_block=0):
+        """
+        Decodes all the lanes (streams of every block) of the interleaved block format
+        together with NumPy: each step reads the next bits of every lane at once, looks
+        the decoded symbols and code lengths up in a table indexed by max_length-bit
+        windows, and moves every lane forward by its code length. The number of steps is
+        the number of symbols in the longest lane, whatever the number of lanes.
+
+        :param progress: Optional callback receiving (steps_done, total_steps).
+        :return: The decoded text of each block.
+        """
+        import numpy as np
+
+        symbols = list(code_dict)
+        max_length = max(len(code) for code in code_dict.values())
+
+        # 1. Table of the symbol and code length starting with each max_length-bit window.
+        table_symbols = np.zeros(1 << max_length, dtype=np.int32)
+        table_lengths = np.zeros(1 << max_length, dtype=np.int64)
+        for index, symbol in enumerate(symbols):
+            code = code_dict[symbol]
+            first = int(code, 2) << (max_length - len(code))
+            table_symbols[first:first + (1 << (max_length - len(code)))] = index
+            table_lengths[first:first + (1 << (max_length - len(code)))] = len(code)
+
+        # 2. Big-endian 32-bit word starting at each byte, so that any window is one lookup.
+        buffer = np.frombuffer(data + bytes(4), dtype=np.uint8).astype(np.uint32)
+        words = (buffer[:-3] << 24) | (buffer[1:-2] << 16) | (buffer[2:-1] << 8) | buffer[3:]
+
+        # 3. One lane per stream of every block, in file order.
+        starts, ends, counts = [], [], []
+        for count, spans in blocks:
+            for s, (offset, length) in enumerate(spans):
+                starts.append(offset * 8)
+                ends.append((offset + length) * 8)
+                counts.append(max(0, (count - s + streams - 1) // streams))
+        positions = np.array(starts, dtype=np.int64)
+        ends = np.array(ends, dtype=np.int64)
+        counts = np.array(counts, dtype=np.int64)
+        if np.any(counts > ends - positions):
+            # Every code is at least one bit long.
+            raise CorruptBlockError(first_block + int(np.argmax(counts > ends - positions)) // streams)
+        steps = int(counts.max(initial=0))
+        # Lanes finishing after each number of steps (a block has lanes of two lengths).
+        finishing = {int(count): np.flatnonzero(counts == count) for count in np.unique(counts)}
+        final_positions = positions.copy()
+
+        # 4. Advance all the lanes together. Finished lanes read on harmlessly, kept inside
+        #    the data, and the position where each lane finished is recorded.
+        decoded = np.empty((steps, len(starts)), dtype=np.int32)
+        shift = np.int64(32 - max_length)
+        mask = np.int64((1 << max_length) - 1)
+        limit = np.int64(len(data) * 8)
+        for step in range(steps):
+            windows = ((words[positions >> 3].astype(np.int64) << (positions & 7)) >> shift) & mask
+            decoded[step] = table_symbols[windows]
+            positions += table_lengths[windows]
+            np.minimum(positions, limit, out=positions)
+            if step + 1 in finishing:
+                final_positions[finishing[step + 1]] = positions[finishing[step + 1]]
+            if progress is not None and (step + 1) % Huffman.PROGRESS_STEP == 0:
+                progress(step + 1, steps)
+        if progress is not None:
+            progress(steps, steps)
+
+        # 5. Every lane must end within the last byte of its stream.
+        overrun = (final_positions > ends) | (ends - final_positions >= 8)
+        if overrun.any():
+            raise CorruptBlockError(first_block + int(np.argmax(overrun)) // streams)
+
+        # 6. Within a block, row-major order over its lanes is the original symbol order.
+        lookup = np.array(symbols, dtype=object)
+        return ["".join(lookup[decoded[:, b * streams:(b + 1) * streams].reshape(-1)[:count]])
+                for b, (count, _) in enumerate(blocks)]
+
+    @staticmethod
+    def decode_lanes_serially(data, code_dict, streams, blocks, progress=None, first_block=0):
+        """
+        Decodes the interleaved block format without NumPy, one stream at a time.
+
+        :param progress: Optional callback receiving (blocks_done, total_blocks).
+        :return: The decoded text of each block.
+        """
+        reverse_dict = {v: k for k, v in code_dict.items()}
+        parts = []
+        for b, (count, spans) in enumerate(blocks):
+            lanes = []
+            for s, (offset, length) in enumerate(spans):
+                expected = max(0, (count - s + streams - 1) // streams)
+                lane = []
+                current_code = ""
+                for bit in "".join(format(byte, "08b") for byte in data[offset:offset + length]):
+                    current_code += bit
+                    if current_code in reverse_dict:
+                        lane.append(reverse_dict[current_code])
+                        current_code = ""
+                        if len(lane) >= expected:
+                            break
+                if len(lane) != expected:
+                    raise CorruptBlockError(first_block + b)
+                lanes.append(lane)
+            parts.append("".join(lanes[i % streams][i // streams] for i in range(count)))
+            if progress is not None:
+                progress(b + 1, len(blocks))
+        return parts
+
+    @staticmethod
+    def compress(file_path, compressed_filename, dictionary_filename, progress=None, streams=None,
+                 alphabet="char", checksum=False):
+        """
+        Compresses the given text file using Huffman encoding and outputs two files:
+          - A binary file containing the encoded text.
+          - A JSON file containing the encoding dictionary.
+
+        Instead of padding the encoded bit string to a multiple of 8, this function writes a header byte
+        indicating the number of valid bits in the final data byte.
+
+        :param file_path: Path to the original text file.
+        :param compressed_filename: Path for the output compressed binary file.
+        :param dictionary_filename: Path for the output encoding dictionary (JSON file).
+        :param progress: Optional callback receiving (symbols_encoded, total_symbols).
+        :param streams: If given, the data is written in the interleaved block format with
+                        this number of streams per block (see Huffman.encode_blocks),
+                        which Huffman.decode recognizes. The default keeps the plain format.
+        :param alphabet: "char" (default), "digram" or "word"; see Huffman.tokenize. The
+                         dictionary then maps each symbol, not only letters, to its code.
+        :param checksum: If True, a CRC32 per block and a SHA-256 of the whole text are
+                         recorded (in the block format) so that Huffman.verify can check
+                         the file.
+        """
+
+        # 1. Read the file's content (encode_text makes it case insensitive).
+        with open(file_path, 'r') as f:
+            text = f.read()
+
+        # 2. Encode it.
+        data, code_dict = Huffman.encode_text(text, progress, streams, alphabet, checksum)
+
+        # 3. Write the binary file.
         with open(compressed_filename, "wb") as bf:
-            bf.write(bytes([remainder]))
-            bf.write(b_array)
+            bf.write(data)
 
-        # 7. Save the encoding dictionary as a JSON file.
+        # 4. Save the encoding dictionary as a JSON file.
         with open(dictionary_filename, "w") as df:
             json.dump(code_dict, df, indent=4)
 
     @staticmethod
-    def decode(compressed_filename, dictionary_filename, output_filename):
+    def decode(compressed_filename, dictionary_filename, output_filename, progress=None):
         """
         Decodes a compressed binary file using the corresponding encoding dictionary.
 
         Steps:
-          1. Load the encoding dictionary from the JSON file and reverse it (code -> letter).
+          1. Load the encoding dictionary from the JSON file.
           2. Read the compressed binary file:
              - The first byte is a header indicating the number of valid bits in the final byte.
              - The rest of the file is the packed encoded data.
-          3. Convert each byte to its binary string. For the last byte, only use the number of valid bits.
-          4. Traverse the bit string and decode it using the reverse dictionary.
-          5. Write the decoded text to the output file.
+          3. Decode it with Huffman.decode_data.
+          4. Write the decoded text to the output file.
 
         :param compressed_filename: Path to the compressed binary file.
         :param dictionary_filename: Path to the JSON file with the encoding dictionary.
         :param output_filename: Path for the output decoded text file.
+        :param progress: Optional callback receiving (bytes_decoded, total_bytes).
         """
-        # 1. Load and reverse the encoding dictionary.
+        # 1. Load the encoding dictionary.
         with open(dictionary_filename, "r") as df:
             code_dict = json.load(df)
-        reverse_dict = {v: k for k, v in code_dict.items()}
 
         # 2. Read the compressed binary file.
         with open(compressed_filename, "rb") as bf:
-            # First byte is the header (number of valid bits in the final byte).
-            valid_bits = int.from_bytes(bf.read(1), byteorder="big")
             data = bf.read()
 
-        # 3. Convert the byte data into a bit string.
-        encoded_str = ""
-        if len(data) > 0:
-            # Process all full bytes.
-            for i in range(len(data) - 1):
-                encoded_str += format(data[i], "08b")
-            # Process the last byte using only the valid bits.
-            last_byte = data[-1]
-            last_bits = format(last_byte, "08b")[:valid_bits]
-            encoded_str += last_bits
-
-        # 4. Decode the bit string.
-        decoded_text = ""
-        current_code = ""
-        for bit in encoded_str:
-            current_code += bit
-            if current_code in reverse_dict:
-                decoded_text += reverse_dict[current_code]
-                current_code = ""
+        # 3. Decode the data.
+        decoded_text = Huffman.decode_data(data, code_dict, progress)
 
-        # 5. Write the decoded text to the output file.
+        # 4. Write the decoded text to the output file.
         with open(output_filename, "w") as out_f:
             out_f.write(decoded_text)
+
+    @staticmethod
+    def verify(compressed_filename, dictionary_filename, progress=None):
+        """
+        Checks that a compressed file decodes cleanly, without writing anything.
+
+        The file is read and decoded piece by piece (VERIFY_LANES lanes of blocks at a
+        time, or VERIFY_READ_SIZE bytes of a plain file) into a SHA-256 hash, so memory
+        use does not grow with the file. When the file records checksums, the CRC32 of
+        every block and the digest of the whole text are compared; otherwise only the
+        decoding itself is checked and a clean file gets ok None, not True. Errors are
+        reported in the result instead of being raised.
+
+        :param compressed_filename: Path to the compressed binary file.
+        :param dictionary_filename: Path to the JSON file with the encoding dictionary.
+        :param progress: Optional callback receiving (bytes_read, total_bytes).
+        :return: A VerificationResult; its digest is the SHA-256 of the decoded text.
+        """
+        start = time.perf_counter()
+        result = VerificationResult(source=compressed_filename, ok=False)
+        try:
+            with open(dictionary_filename, "r") as df:
+                code_dict = json.load(df)
+            with open(compressed_filename, "rb") as f:
+                if f.read(len(Huffman.BLOCK_MAGIC)) == Huffman.BLOCK_MAGIC:
+                    f.seek(0)
+                    Huffman.verify_blocks(f, code_dict, result, progress)
+                else:
+                    f.seek(0)
+                    Huffman.verify_plain(f, code_dict, result, progress)
+            if result.error is None:
+                result.ok = True if result.checksummed else None
+        except CorruptBlockError as e:
+            result.block = e.block
+            result.error = str(e)
+        except (OSError, ValueError) as e:
+            result.error = str(e)
+
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def verify_blocks(f, code_dict, result, progress=None):
+        """Verifies a file in the interleaved block format, filling the given VerificationResult."""
+        total = f.seek(0, io.SEEK_END)
+        f.seek(0)
+        version, streams, block_symbols, digest = Huffman.read_block_header(f)
+        result.checksummed = digest is not None
+        result.format = "blocks+checksums" if result.checksummed else "blocks"
+        group_size = max(1, Huffman.VERIFY_LANES // streams)
+        text_hash = hashlib.sha256()
+
+        def check(group):
+            texts = Huffman.decode_block_group(group, code_dict, streams, first_block=result.blocks)
+            for text, (count, _, _, crc) in zip(texts, group):
+                encoded = text.encode()
+                if crc is not None and zlib.crc32(encoded) != crc:
+                    raise CorruptBlockError(result.blocks, "failed its checksum")
+                text_hash.update(encoded)
+                result.blocks += 1
+                result.symbols += count
+                result.text_bytes += len(encoded)
+            if progress is not None:
+                progress(f.tell(), total)
+
+        group = []
+        for block in Huffman.iter_blocks(f, version, streams, block_symbols):
+            group.append(block)
+            if len(group) == group_size:
+                check(group)
+                group = []
+        if group:
+            check(group)
+
+        result.digest = text_hash.hexdigest()
+        if digest is not None and text_hash.digest() != digest:
+            result.error = "The decoded text does not match the file digest."
+
+    @staticmethod
+    def verify_plain(f, code_dict, result, progress=None):
+        """
+        Verifies a file in the plain format, filling the given VerificationResult. With no
+        checksum recorded, the check is that every code is valid and that the data does
+        not end in the middle of a code.
+        """
+        total = f.seek(0, io.SEEK_END)
+        f.seek(0)
+        result.format = "plain"
+        reverse_dict = {v: k for k, v in code_dict.items()}
+        max_length = max((len(code) for code in code_dict.values()), default=0)
+        text_hash = hashlib.sha256()
+
+        header = f.read(1)
+        if not header or header[0] > 8:
+            raise ValueError("Unsupported compressed file format.")
+        valid_bits = header[0]
+
+        current_code = ""
+        position = 1
+        chunk = f.read(Huffman.VERIFY_READ_SIZE)
+        while chunk:
+            next_chunk = f.read(Huffman.VERIFY_READ_SIZE)
+            encoded_str = "".join(format(byte, "08b") for byte in chunk[:-1])
+            last_bits = format(chunk[-1], "08b")
+            # Only the valid bits of the final byte, stored in its low-order bits, count.
+            encoded_str += last_bits if next_chunk else last_bits[8 - valid_bits:]
+
+            decoded_parts = []
+            for i, bit in enumerate(encoded_str):
+                current_code += bit
+                if current_code in reverse_dict:
+                    decoded_parts.append(reverse_dict[current_code])
+                    current_code = ""
+                elif len(current_code) >= max_length:
+                    raise ValueError(f"Invalid code ending at byte {position + i // 8}.")
+            text = "".join(decoded_parts).encode()
+            text_hash.update(text)
+            result.symbols += len(decoded_parts)
+            result.text_bytes += len(text)
+
+            position += len(chunk)
+            chunk = next_chunk
+            if progress is not None:
+                progress(position, total)
+
+        if current_code:
+            raise ValueError("The data ends in the middle of a code.")
+        result.digest = text_hash.hexdigest()
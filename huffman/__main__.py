@@ -0,0 +1,6 @@
+import sys
+
+from huffman.CommandLine import CommandLine
+
+if __name__ == "__main__":
+    sys.exit(CommandLine.main())
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+
+from steganography.Steganography import Steganography
+
+
+class BatchSteganography:
+    """
+    Spreads one message over a pool of PNG/WAV carriers.
+
+    Carrier capacities are read from the file headers only, the payload is split across
+    the carriers in order, and the embeddings run on a process pool. A JSON manifest
+    lists the parts (output carrier, key, offset and length) and a SHA-256 of the whole
+    payload, so that the message can be reassembled and checked by
+    BatchSteganography.extract_message.
+
+    Image parts are always saved as PNG, whatever the format of their source: a lossy
+    format would destroy the hidden bits.
+    """
+    MANIFEST_VERSION = 2
+    # Manifests that can still be read; version 1 has no payload digest.
+    MANIFEST_VERSIONS = (1, 2)
+
+    @staticmethod
+    def is_audio(carrier_path: str) -> bool:
+        """Tells whether a carrier is handled as WAV audio (otherwise as an image)."""
+        return os.path.splitext(carrier_path)[1].lower() == ".wav"
+
+    @staticmethod
+    def carrier_capacity(carrier_path: str, depth: int = 1) -> int:
+        """Returns the number of bytes a carrier can hold, without decoding it."""
+        if BatchSteganography.is_audio(carrier_path):
+            return Steganography.audio_capacity(carrier_path, depth)
+        return Steganography.image_capacity(carrier_path, depth)
+
+    @staticmethod
+    def hide_message(carrier_paths: Iterable[str], secret_message: str, output_folder: str,
+                     manifest_path: str, depth: int = 1, seed: Optional[int] = None,
+                     compress: bool = False, max_workers: Optional[int] = None) -> dict:
+        """
+        Hides a message across several carriers.
+
+        Steps:
+         - Encode the message (Huffman-packed if requested) into one payload.
+         - Read the capacity of every carrier from its header and fail before any
+           decoding if they cannot hold the payload together.
+         - Cut the payload into consecutive parts filling the carriers in order; carriers
+           left over are not used.
+         - Embed the parts on a process pool, one output carrier (a PNG image or a WAV
+           file) and key per part, in output_folder.
+         - Save the manifest describing the parts and the digest of the payload.
+
+        :return: The manifest, as saved.
+        """
+        payload, flags = Steganography.encode_message(secret_message, compress)
+
+        # 1. Plan the parts from the header capacities.
+        parts = []
+        offset = 0
+        for i, carrier_path in enumerate(carrier_paths):
+            if offset >= len(payload):
+                break
+            length = min(BatchSteganography.carrier_capacity(carrier_path, depth), len(payload) - offset)
+            if length == 0:
+                continue
+            name = f"{i:03d}_{os.path.splitext(os.path.basename(carrier_path))[0]}"
+            extension = ".wav" if BatchSteganography.is_audio(carrier_path) else ".png"
+            parts.append({
+                "source": carrier_path,
+                "carrier": os.path.join(output_folder, name + extension),
+                "key": os.path.join(output_folder, name + ".key"),
+                "offset": offset,
+                "length": length,
+            })
+            offset += length
+        if offset < len(payload):
+            raise ValueError("Secret message is too long to hide in these carriers.")
+
+        # 2. Embed every part in parallel.
+        os.makedirs(output_folder, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for part in parts:
+                embed = (Steganography.embed_payload_in_audio if BatchSteganography.is_audio(part["source"])
+                         else Steganography.embed_payload_in_image)
+                futures.append(executor.submit(
+                    embed, part["source"], payload[part["offset"]:part["offset"] + part["length"]],
+                    part["carrier"], part["key"], seed=seed, depth=depth
+                ))
+            for future in futures:
+                future.result()
+
+        # 3. Save the manifest, with paths relative to its folder.
+        manifest_folder = os.path.dirname(os.path.abspath(manifest_path))
+        manifest = {
+            "version": BatchSteganography.MANIFEST_VERSION,
+            "flags": flags,
+            "length": len(payload),
+            "sha256": hashlib.sha256(payload).hexdigest(),
+            "parts": [
+                {
+                    "carrier": os.path.relpath(os.path.abspath(part["carrier"]), manifest_folder),
+                    "key": os.path.relpath(os.path.abspath(part["key"]), manifest_folder),
+                    "offset": part["offset"],
+                    "length": part["length"],
+                }
+                for part in parts
+            ],
+        }
+        with open(manifest_path, "w") as mf:
+            json.dump(manifest, mf, indent=4)
+        return manifest
+
+    @staticmethod
+    def extract_message(manifest_path: str, max_workers: Optional[int] = None) -> str:
+        """
+        Reassembles a message hidden by BatchSteganography.hide_message.
+
+        The parts listed in the manifest are extracted on a process pool, concatenated
+        by offset, checked against the digest of the payload and decoded.
+        """
+        with open(manifest_path, "r") as mf:
+            manifest = json.load(mf)
+        if manifest.get("version") not in BatchSteganography.MANIFEST_VERSIONS:
+            raise ValueError("Unsupported manifest version.")
+
+        manifest_folder = os.path.dirname(os.path.abspath(manifest_path))
+        parts = sorted(manifest["parts"], key=lambda part: part["offset"])
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = []
+            for part in parts:
+                carrier_path = os.path.join(manifest_folder, part["carrier"])
+                key_path = os.path.join(manifest_folder, part["key"])
+                extract = (Steganography.extract_payload_from_audio if BatchSteganography.is_audio(carrier_path)
+                           else Steganography.extract_payload_from_image)
+                futures.append(executor.submit(extract, carrier_path, key_path))
+            chunks = [future.result()[0] for future in futures]
+
+        payload = b"".join(chunks)
+        if len(payload) != manifest["length"]:
+            raise ValueError("The extracted parts do not match the manifest.")
+        if "sha256" in manifest and hashlib.sha256(payload).hexdigest() != manifest["sha256"]:
+            raise ValueError("The extracted message is corrupted: a carrier was altered or re-encoded.")
+        return Steganography.decode_message(payload, manifest["flags"])
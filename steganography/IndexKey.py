@@ -0,0 +1,155 @@
+import struct
+from typing import Optional
+
+import numpy as np
+
+
+class IndexKey:
+    """
+    Compact binary files recording which pixels or samples carry a hidden message.
+
+    A key starts with the MAGIC bytes, a version byte, a kind byte, the embedding depth
+    (number of low-order bits used in each pixel channel or sample) and a byte of
+    payload flags, followed by:
+      - RANGE:  start, step and count of an arithmetic progression of indices.
+      - SEEDED: seed, count and population; the indices are the first count values of a
+                pseudo-random permutation of range(population) regenerated from the seed.
+
+    Files that do not start with MAGIC are read as the legacy comma-separated text format.
+    """
+    MAGIC = b"STGK"
+    VERSION = 2
+
+    RANGE = 0
+    SEEDED = 1
+
+    HEADER = struct.Struct("<4sBB")
+    # Fields following the header since version 2 (version 1 keys have depth 1, no flags).
+    OPTIONS = struct.Struct("<BB")
+    RANGE_FIELDS = struct.Struct("<QqQ")
+    SEEDED_FIELDS = struct.Struct("<QQQ")
+
+    # Seeds are stored as unsigned 64-bit integers.
+    SEED_LIMIT = 1 << 64
+
+    # Number of rounds of the Feistel network behind SEEDED keys.
+    FEISTEL_ROUNDS = 4
+
+    @staticmethod
+    def header(kind: int, depth: int, flags: int) -> bytes:
+        """Builds the bytes common to every kind of key."""
+        return IndexKey.HEADER.pack(IndexKey.MAGIC, IndexKey.VERSION, kind) + IndexKey.OPTIONS.pack(depth, flags)
+
+    @staticmethod
+    def write_range(key_file_path: str, count: int, start: int = 0, step: int = 1,
+                    depth: int = 1, flags: int = 0):
+        """Saves the indices start, start + step, ... (count of them)."""
+        with open(key_file_path, "wb") as f:
+            f.write(IndexKey.header(IndexKey.RANGE, depth, flags))
+            f.write(IndexKey.RANGE_FIELDS.pack(start, step, count))
+
+    @staticmethod
+    def write_seeded(key_file_path: str, seed: int, count: int, population: int,
+                     depth: int = 1, flags: int = 0):
+        """Saves a seed from which count distinct indices below population are regenerated."""
+        IndexKey.check_seed(seed)
+        with open(key_file_path, "wb") as f:
+            f.write(IndexKey.header(IndexKey.SEEDED, depth, flags))
+            f.write(IndexKey.SEEDED_FIELDS.pack(seed, count, population))
+
+    @staticmethod
+    def kind(key_file_path: str) -> Optional[int]:
+        """Returns the kind of a binary key (RANGE or SEEDED), or None for a legacy text key."""
+        with open(key_file_path, "rb") as f:
+            header = f.read(IndexKey.HEADER.size)
+        if len(header) < IndexKey.HEADER.size or not header.startswith(IndexKey.MAGIC):
+            return None
+        return IndexKey.HEADER.unpack(header)[2]
+
+    @staticmethod
+    def load(key_file_path: str) -> tuple[np.ndarray, int, int]:
+        """
+        Loads a key file, whatever its format.
+
+        :param key_file_path: Path to a binary key or to a legacy comma-separated index file.
+        :return: A tuple (indices, depth, flags); indices is an int64 array in embedding order.
+        """
+        with open(key_file_path, "rb") as f:
+            content = f.read()
+
+        if not content.startswith(IndexKey.MAGIC):
+            text = content.decode("ascii").strip()
+            if not text:
+                raise ValueError("No indices found in the provided file.")
+            return np.array([int(num) for num in text.split(',')], dtype=np.int64), 1, 0
+
+        _, version, kind = IndexKey.HEADER.unpack_from(content)
+        body = content[IndexKey.HEADER.size:]
+        if version == 1:
+            depth, flags = 1, 0
+        elif version == IndexKey.VERSION:
+            depth, flags = IndexKey.OPTIONS.unpack_from(body)
+            body = body[IndexKey.OPTIONS.size:]
+        else:
+            raise ValueError(f"Unsupported key version {version}.")
+
+        if kind == IndexKey.RANGE:
+            start, step, count = IndexKey.RANGE_FIELDS.unpack_from(body)
+            indices = start + step * np.arange(count, dtype=np.int64)
+        elif kind == IndexKey.SEEDED:
+            seed, count, population = IndexKey.SEEDED_FIELDS.unpack_from(body)
+            indices = IndexKey.seeded_indices(seed, count, population)
+        else:
+            raise ValueError(f"Unknown key kind {kind}.")
+        return indices, depth, flags
+
+    @staticmethod
+    def check_seed(seed: int):
+        """Raises a ValueError when the seed cannot be stored in a key."""
+        if not 0 <= seed < IndexKey.SEED_LIMIT:
+            raise ValueError(f"The seed must be between 0 and {IndexKey.SEED_LIMIT - 1}.")
+
+    @staticmethod
+    def seeded_indices(seed: int, count: int, population: int) -> np.ndarray:
+        """
+        Returns the images of 0 .. count - 1 under a pseudo-random permutation of
+        range(population) derived from the seed.
+
+        The permutation is a balanced Feistel network over the smallest even number of
+        bits covering population; values that land outside range(population) are
+        encrypted again (cycle walking), which keeps the result a permutation. It only
+        relies on 64-bit integer arithmetic, so the indices are the same on every
+        platform and NumPy version.
+        """
+        IndexKey.check_seed(seed)
+        if count > population:
+            raise ValueError("Cannot select more indices than the population holds.")
+
+        half_bits = max(1, (max(population - 1, 1).bit_length() + 1) // 2)
+        mask = np.uint64((1 << half_bits) - 1)
+        round_keys = [np.uint64(IndexKey.mix64(seed * IndexKey.FEISTEL_ROUNDS + r))
+                      for r in range(IndexKey.FEISTEL_ROUNDS)]
+
+        def encrypt(values: np.ndarray) -> np.ndarray:
+            left, right = values >> np.uint64(half_bits), values & mask
+            for key in round_keys:
+                mixed = (right ^ key) * np.uint64(0x9E3779B97F4A7C15)
+                mixed ^= mixed >> np.uint64(29)
+                left, right = right, left ^ (mixed & mask)
+            return (left << np.uint64(half_bits)) | right
+
+        values = encrypt(np.arange(count, dtype=np.uint64))
+        outside = values >= np.uint64(population)
+        while outside.any():
+            values[outside] = encrypt(values[outside])
+            outside = values >= np.uint64(population)
+
+        return values.astype(np.int64)
+
+    @staticmethod
+    def mix64(value: int) -> int:
+        """SplitMix64 finalizer, used to derive independent round keys from the seed."""
+        value = (value + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        return value ^ (value >> 31)
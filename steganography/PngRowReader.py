@@ -0,0 +1,173 @@
+import struct
+import zlib
+
+import numpy as np
+
+
+class PngRowReader:
+    """
+    Decodes the first rows of a PNG image without inflating the rest of the file.
+
+    PNG rows are stored one after the other in a single zlib stream, each one preceded
+    by a filter byte, so the rows at the top of an image can be recovered by inflating
+    and unfiltering only as many bytes as they occupy. Only non-interlaced images with
+    8 bits per channel in grayscale, grayscale + alpha, RGB or RGBA are handled; use
+    PngRowReader.supports before reading.
+    """
+    SIGNATURE = b"\x89PNG\r\n\x1a\n"
+    # Number of channels for each supported PNG color type.
+    CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+    # Size of the blocks read from the file while looking for image data.
+    READ_SIZE = 1 << 16
+    # Average and Paeth rows are unfiltered byte by byte in Python: one of them costs
+    # about as much as this many rows of a full decode by PIL.
+    PYTHON_ROW_COST = 32
+
+    def __init__(self, png_image_file_path: str):
+        """
+        Reads the PNG header.
+
+        :param png_image_file_path: Path to the PNG file.
+        """
+        self.path = png_image_file_path
+        with open(png_image_file_path, "rb") as f:
+            header = f.read(33)
+        if len(header) < 33 or header[:8] != PngRowReader.SIGNATURE or header[12:16] != b"IHDR":
+            raise ValueError("Not a PNG file.")
+
+        (self.width, self.height, self.bit_depth, self.color_type,
+         _, _, self.interlace) = struct.unpack(">IIBBBBB", header[16:29])
+        self.channels = PngRowReader.CHANNELS.get(self.color_type, 0)
+
+    def supports(self) -> bool:
+        """Tells whether the rows of this image can be decoded by read_rows."""
+        return self.bit_depth == 8 and self.interlace == 0 and self.channels > 0
+
+    def idat_blocks(self):
+        """Yields the compressed image data, block by block, in file order."""
+        with open(self.path, "rb") as f:
+            f.seek(8)
+            while True:
+                chunk_header = f.read(8)
+                if len(chunk_header) < 8:
+                    return
+                length, chunk_type = struct.unpack(">I4s", chunk_header)
+                if chunk_type == b"IEND":
+                    return
+                if chunk_type != b"IDAT":
+                    f.seek(length + 4, 1)  # chunk data and CRC
+                    continue
+                remaining = length
+                while remaining > 0:
+                    data = f.read(min(PngRowReader.READ_SIZE, remaining))
+                    if not data:
+                        return
+                    remaining -= len(data)
+                    yield data
+                f.seek(4, 1)  # CRC
+
+    def read_rows(self, count: int) -> np.ndarray:
+        """
+        Decodes the first rows of the image.
+
+        :param count: Number of rows to decode (clamped to the image height).
+        :return: A uint8 array of shape (count, width * channels), channels interleaved
+                 as in np.asarray(Image.open(path)).
+        """
+        return self.unfilter_rows(self.inflate_rows(count))
+
+    def inflate_rows(self, count: int) -> bytearray:
+        """
+        Inflates the filtered bytes of the first rows (each one preceded by its filter type).
+
+        :param count: Number of rows to inflate (clamped to the image height).
+        """
+        if not self.supports():
+            raise ValueError("Only non-interlaced 8-bit grayscale, RGB and alpha PNG images are supported.")
+
+        needed = min(count, self.height) * (self.width * self.channels + 1)
+        decompressor = zlib.decompressobj()
+        raw = bytearray()
+        for block in self.idat_blocks():
+            raw += decompressor.decompress(block, needed - len(raw))
+            while decompressor.unconsumed_tail and len(raw) < needed:
+                raw += decompressor.decompress(decompressor.unconsumed_tail, needed - len(raw))
+            if len(raw) >= needed:
+                break
+        if len(raw) < needed:
+            raise ValueError("PNG image data is truncated.")
+        return raw
+
+    def unfilter_cost(self, raw: bytearray) -> int:
+        """
+        Estimates the cost of PngRowReader.unfilter_rows on inflated rows, in rows of a
+        full decode of the image by PIL.
+        """
+        filter_types = np.frombuffer(raw, dtype=np.uint8)[::self.width * self.channels + 1]
+        slow_rows = int(np.count_nonzero(filter_types >= 3))
+        return filter_types.size - slow_rows + slow_rows * PngRowReader.PYTHON_ROW_COST
+
+    def unfilter_rows(self, raw: bytearray) -> np.ndarray:
+        """
+        Undoes the filters of rows inflated by PngRowReader.inflate_rows.
+
+        :return: A uint8 array of shape (rows, width * channels).
+        """
+        bpp = self.channels
+        stride = self.width * bpp
+        count = len(raw) // (stride + 1)
+
+        rows = np.empty((count, stride), dtype=np.uint8)
+        prior = np.zeros(stride, dtype=np.uint8)
+        for y in range(count):
+            offset = y * (stride + 1)
+            filter_type = raw[offset]
+            line = np.frombuffer(raw, dtype=np.uint8, count=stride, offset=offset + 1)
+
+            if filter_type == 0:  # None
+                row = line.copy()
+            elif filter_type == 1:  # Sub: running sum of each channel along the row
+                row = np.cumsum(line.reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+            elif filter_type == 2:  # Up
+                row = line + prior
+            elif filter_type == 3:  # Average
+                row = PngRowReader.unfilter_average(line.tolist(), prior.tolist(), bpp)
+            elif filter_type == 4:  # Paeth
+                row = PngRowReader.unfilter_paeth(line.tolist(), prior.tolist(), bpp)
+            else:
+                raise ValueError(f"Unknown PNG filter type {filter_type}.")
+
+            rows[y] = row
+            prior = rows[y]
+
+        return rows
+
+    @staticmethod
+    def unfilter_average(line: list[int], prior: list[int], bpp: int) -> np.ndarray:
+        """Reverses the Average filter; each byte depends on the previous pixel."""
+        row = [0] * len(line)
+        for i in range(len(line)):
+            left = row[i - bpp] if i >= bpp else 0
+            row[i] = (line[i] + ((left + prior[i]) >> 1)) & 0xFF
+        return np.array(row, dtype=np.uint8)
+
+    @staticmethod
+    def unfilter_paeth(line: list[int], prior: list[int], bpp: int) -> np.ndarray:
+        """Reverses the Paeth filter; each byte depends on the previous pixel."""
+        row = [0] * len(line)
+        for i in range(len(line)):
+            if i >= bpp:
+                a, c = row[i - bpp], prior[i - bpp]
+            else:
+                a = c = 0
+            b = prior[i]
+            p = a + b - c
+            pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            if pa <= pb and pa <= pc:
+                predictor = a
+            elif pb <= pc:
+                predictor = b
+            else:
+                predictor = c
+            row[i] = (line[i] + predictor) & 0xFF
+        return np.array(row, dtype=np.uint8)
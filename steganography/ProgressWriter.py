@@ -0,0 +1,27 @@
+from typing import BinaryIO, Callable
+
+
+class ProgressWriter:
+    """
+    Write-only file object forwarding to an open file and reporting, after every write,
+    the number of bytes written so far.
+
+    PIL encodes a PNG into such an object chunk by chunk (it has no file descriptor to
+    write to directly), so a long save reports its progress, and is interrupted when the
+    callback raises.
+    """
+
+    def __init__(self, f: BinaryIO, progress: Callable[[int], None]):
+        self.f = f
+        self.name = f.name
+        self.progress = progress
+        self.written = 0
+
+    def write(self, data) -> int:
+        count = self.f.write(data)
+        self.written += count
+        self.progress(self.written)
+        return count
+
+    def flush(self):
+        self.f.flush()
@@ -1,10 +1,30 @@
-import struct
+import os
 import wave
+from typing import Callable, Optional
 
-from PIL import Image
+import numpy as np
+from PIL import Image, ImageFile
+
+from huffman.Huffman import Huffman
+from steganography.IndexKey import IndexKey
+from steganography.PngRowReader import PngRowReader
+from steganography.ProgressWriter import ProgressWriter
 
 
 class Steganography:
+    # Image modes kept as they are; other images are converted to one of them.
+    IMAGE_MODES = ('L', 'LA', 'RGB', 'RGBA')
+    # Largest number of low-order bits that may be replaced in each channel or sample.
+    MAX_DEPTH = 4
+    # Key flag telling that the hidden payload was packed with Huffman.pack_payload.
+    FLAG_HUFFMAN = 0x01
+    # Number of WAV frames processed at once around the samples carrying the payload.
+    AUDIO_CHUNK_FRAMES = 1 << 16
+    # Number of WAV frames copied at once through the regions without payload.
+    AUDIO_COPY_FRAMES = 1 << 20
+    # Number of bytes of an image file fed at once to PIL when progress is reported.
+    IMAGE_CHUNK_BYTES = 1 << 20
+
     @staticmethod
     def text_to_binary(text: str) -> str:
         """
@@ -27,230 +47,550 @@ class Steganography:
         """
         return ''.join(chr(int(binary_str[i:i + 8], 2)) for i in range(0, len(binary_str), 8))
 
+    @staticmethod
+    def text_to_bytes(text: str) -> bytes:
+        """
+        Encodes a message with one byte per character, as text_to_binary does.
+
+        Raises ValueError for characters that do not fit in 8 bits.
+        """
+        try:
+            return text.encode("latin-1")
+        except UnicodeEncodeError:
+            raise ValueError("Only characters with a code point below 256 can be hidden.")
+
+    @staticmethod
+    def encode_message(secret_message: str, compress: bool) -> tuple[bytes, int]:
+        """
+        Turns a message into the payload to hide, along with the key flags describing it.
+
+        With compress, the message is packed with Huffman.pack_payload (code table
+        included), unless that would not make it smaller, e.g. for very short messages.
+        """
+        payload = Steganography.text_to_bytes(secret_message)
+        if compress:
+            packed = Huffman.pack_payload(payload)
+            if len(packed) < len(payload):
+                return packed, Steganography.FLAG_HUFFMAN
+        return payload, 0
+
+    @staticmethod
+    def decode_message(payload: bytes, flags: int) -> str:
+        """Reverses Steganography.encode_message."""
+        if flags & Steganography.FLAG_HUFFMAN:
+            payload = Huffman.unpack_payload(payload)
+        return payload.decode("latin-1")
+
+    @staticmethod
+    def bytes_to_slot_values(payload: bytes, depth: int) -> np.ndarray:
+        """
+        Splits a payload into groups of depth bits (most significant bit first, the last
+        group padded with zeros) and returns the value of each group. Each value is
+        written into the low-order bits of one pixel channel or audio sample.
+        """
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+        bits = np.concatenate((bits, np.zeros(-bits.size % depth, dtype=np.uint8)))
+        shifts = np.arange(depth - 1, -1, -1, dtype=np.uint8)
+        return (bits.reshape(-1, depth) << shifts).sum(axis=1, dtype=np.uint8)
+
+    @staticmethod
+    def slot_values_to_bytes(values: np.ndarray, depth: int) -> bytes:
+        """
+        Reverses bytes_to_slot_values: concatenates the depth bits of each value and packs
+        them into bytes, dropping the padding bits of the last group.
+        """
+        shifts = np.arange(depth - 1, -1, -1, dtype=np.uint8)
+        bits = (values.astype(np.uint8)[:, None] >> shifts) & 1
+        bits = bits.reshape(-1)
+        return np.packbits(bits[:bits.size - bits.size % 8]).tobytes()
+
+    @staticmethod
+    def check_depth(depth: int):
+        """Raises ValueError if depth is not a supported number of bits per channel or sample."""
+        if not 1 <= depth <= Steganography.MAX_DEPTH:
+            raise ValueError(f"Embedding depth must be between 1 and {Steganography.MAX_DEPTH} bits.")
+
+    @staticmethod
+    def carrier_mode(img: Image.Image) -> str:
+        """
+        Returns the mode in which an image carries a message: its own mode if it is one of
+        IMAGE_MODES, 'L' for other single-channel modes, and 'RGB' or 'RGBA' otherwise
+        (for instance for palette images, whose indices cannot be modified safely).
+        """
+        if img.mode in Steganography.IMAGE_MODES:
+            return img.mode
+        if img.mode in ('1', 'I', 'I;16', 'I;16B', 'I;16L', 'F'):
+            return 'L'
+        if 'A' in img.getbands() or 'transparency' in img.info:
+            return 'RGBA'
+        return 'RGB'
+
+    @staticmethod
+    def image_capacity(png_image_file_path: str, depth: int = 1) -> int:
+        """
+        Returns the number of characters (bytes) that can be hidden in an image.
+
+        Only the image header is read: the capacity follows from the size and the number
+        of channels of the carrier mode.
+        """
+        Steganography.check_depth(depth)
+        with Image.open(png_image_file_path) as img:
+            channels = Image.getmodebands(Steganography.carrier_mode(img))
+            return img.width * img.height * channels * depth // 8
+
+    @staticmethod
+    def audio_capacity(wav_audio_file_path: str, depth: int = 1) -> int:
+        """
+        Returns the number of characters (bytes) that can be hidden in a WAV file, from
+        the number of frames and channels recorded in its header.
+        """
+        Steganography.check_depth(depth)
+        with wave.open(wav_audio_file_path, 'rb') as wav_in:
+            return wav_in.getnframes() * wav_in.getnchannels() * depth // 8
+
     @staticmethod
     def hide_message_in_image(png_image_file_path: str, secret_message: str,
-                              output_image_path: str, pixel_numbers_file_path: str):
+                              output_image_path: str, pixel_numbers_file_path: str,
+                              seed: Optional[int] = None, depth: int = 1, compress: bool = False,
+                              progress: Optional[Callable[[int, int], None]] = None):
         """
-        Hide a text message inside a PNG image by modifying the LSB of each pixel.
-        The image is converted to grayscale ('L' mode) and each character is encoded
-        as 8-bit binary.  A pixel index file is saved alongside the image.
+        Hide a text message inside a PNG image by modifying the low-order bits of its
+        pixel channels. Each character is encoded as 8-bit binary and a compact index
+        key (see IndexKey) is saved alongside the image.
+
+        With compress, the message is Huffman-encoded first, which usually shrinks text
+        by about 40% and touches that many fewer carrier values; the key records it so
+        that extraction decodes it transparently.
 
         Steps:
-         - Convert the secret message into an 8-bit binary string.
-         - Open the image in L mode (grayscale).
-         - For each selected pixel (the first pixels up to the length of the binary message):
-             - Get its grayscale channel value.
-             - Replace the LSB of that value with the corresponding secret bit.
-         - Save the new image in the original mode.
-         - Save the list of pixel indices used in a file.
-        """
-        # Convert the secret message to binary
-        binary_text = Steganography.text_to_binary(secret_message)
-        binary_length = len(binary_text)
-
-        # Open the image in grayscale mode
-        img = Image.open(png_image_file_path).convert('L')
-        pixels = list(img.getdata())
-        if binary_length > len(pixels):
+         - Convert the secret message into bytes (8 bits per character), Huffman-packed
+           if requested.
+         - Embed them with Steganography.embed_payload_in_image.
+        """
+        payload, flags = Steganography.encode_message(secret_message, compress)
+        Steganography.embed_payload_in_image(
+            png_image_file_path, payload, output_image_path, pixel_numbers_file_path, seed=seed, depth=depth,
+            flags=flags, progress=progress
+        )
+
+    @staticmethod
+    def embed_payload_in_image(png_image_file_path: str, payload: bytes, output_image_path: str,
+                               key_file_path: str, seed: Optional[int] = None, depth: int = 1,
+                               flags: int = 0, progress: Optional[Callable[[int, int], None]] = None):
+        """
+        Hides raw bytes inside an image.
+
+        Every channel of every pixel (R, G, B and A, or L and A) is a slot carrying depth
+        low-order bits, so an RGBA image holds 4 * depth bits per pixel. The image keeps
+        its mode when it is one of IMAGE_MODES (see Steganography.carrier_mode).
+
+        Without a seed, the first slots are used and the key only records their count.
+        With a seed, the slots are spread over the whole image following a pseudo-random
+        permutation that the key regenerates from the seed.
+
+        progress, if given, receives (bytes_done, total_bytes) while the image file is
+        read then while the new one is written, total_bytes being the size of the image
+        file plus that of its pixels (a bound on the size of the PNG written).
+
+        Steps:
+         - Split the payload into groups of depth bits.
+         - Open the image in its carrier mode as a NumPy array of channel values.
+         - Replace the low-order bits of the selected channel values with the groups, all
+           at once through array indexing.
+         - Save the new image in the carrier mode.
+         - Save the key of the slots used (with the depth and flags) in a file.
+        """
+        Steganography.check_depth(depth)
+        values = Steganography.bytes_to_slot_values(payload, depth)
+
+        # Open the image in its carrier mode and copy its channels into a writable array
+        img = Image.open(png_image_file_path)
+        mode = Steganography.carrier_mode(img)
+        read_size = pixels_size = 0
+        if progress is not None:
+            read_size = os.path.getsize(png_image_file_path)
+            total = read_size + img.width * img.height * Image.getmodebands(mode)
+            img = Steganography.decode_image_file(png_image_file_path, lambda done: progress(done, total))
+            pixels_size = total - read_size
+        img = img.convert(mode)
+        pixels = np.array(img)
+        flat = pixels.reshape(-1)
+        if values.size > flat.size:
             raise ValueError("Secret message is too long to hide in this image.")
 
-        # Select the first binary_length pixel indices
-        pixel_numbers = list(range(binary_length))
+        # Select one slot per group of bits
+        if seed is None:
+            slot_numbers = np.arange(values.size)
+        else:
+            slot_numbers = IndexKey.seeded_indices(seed, values.size, flat.size)
 
-        # Modify the LSB of the grayscale channel for each selected pixel
-        new_pixels = list(pixels)
-        for idx, bit in zip(pixel_numbers, binary_text):
-            pixel = pixels[idx]  # Get the pixel
-            # Set the LSB of the red channel to the secret bit
-            new_pixel = (pixel & ~1) | int(bit)
-            # Reconstruct the pixel with the modified red channel and original other channels
-            new_pixels[idx] = new_pixel
+        # Replace the low-order bits of every selected slot in a single vectorized operation
+        flat[slot_numbers] = (flat[slot_numbers] >> depth << depth) | values
 
-        # Create a new image with the same mode and save it
-        new_img = Image.new(img.mode, img.size)
-        new_img.putdata(new_pixels)
-        new_img.save(output_image_path)
+        # Create a new image with the same mode from the modified array and save it
+        Steganography.save_image(
+            Image.frombytes(img.mode, img.size, pixels.tobytes()), output_image_path,
+            None if progress is None else lambda done: progress(read_size + min(done, pixels_size), total)
+        )
 
-        # Save the pixel indices
-        with open(pixel_numbers_file_path, "w") as f:
-            f.write(','.join(str(n) for n in pixel_numbers))
+        # Save the slot indices key
+        if seed is None:
+            IndexKey.write_range(key_file_path, values.size, depth=depth, flags=flags)
+        else:
+            IndexKey.write_seeded(key_file_path, seed, values.size, flat.size, depth=depth, flags=flags)
+        if progress is not None:
+            progress(total, total)
 
     @staticmethod
-    def extract_message_from_image(png_image_file_path: str, pixel_numbers_file_path: str) -> str:
+    def decode_image_file(image_file_path: str, progress: Callable[[int], None]) -> Image.Image:
         """
-        Extracts a hidden message from a PNG image by reading the least
-        significant bit (LSB) of the specified pixel grayscale channel values.
+        Decodes a whole image file with PIL, feeding it IMAGE_CHUNK_BYTES at a time, and
+        calls progress(bytes_read) after each chunk. This is a little slower than
+        decoding it in one go, but the callback may interrupt it by raising.
+        """
+        parser = ImageFile.Parser()
+        with open(image_file_path, "rb") as f:
+            while chunk := f.read(Steganography.IMAGE_CHUNK_BYTES):
+                parser.feed(chunk)
+                progress(f.tell())
+        return parser.close()
 
-        Steps:
-         - Read the list of pixel indices from the pixel numbers file.
-         - Open the image in L mode (grayscale).
-         - For each pixel index in the list:
-             - Get the pixel's grayscale channel value.
-             - Extract the LSB.
-         - Reconstruct the binary message and convert it back to text.
-        """
-        # Read the pixel indices
-        with open(pixel_numbers_file_path, "r") as f:
-            content = f.read().strip()
-        if not content:
-            raise ValueError("No pixel indices found in the provided file.")
-        pixel_numbers = [int(num) for num in content.split(',')]
-
-        # Open the image in its original mode
-        img = Image.open(png_image_file_path)
-        if img.mode != 'L':
-            raise ValueError("Image must be in 'L' mode (grayscale).")
-        pixels = list(img.getdata())
+    @staticmethod
+    def save_image(img: Image.Image, output_image_path: str, progress: Optional[Callable[[int], None]] = None):
+        """
+        Saves an image in the format given by the extension of its path. With progress,
+        the encoded chunks go through a ProgressWriter reporting the bytes written, and
+        the file is removed if the callback interrupts the save.
+        """
+        if progress is None:
+            img.save(output_image_path)
+            return
+        try:
+            with open(output_image_path, "wb") as f:
+                img.save(ProgressWriter(f, progress))
+        except BaseException:
+            os.remove(output_image_path)
+            raise
 
-        # Extract the LSB from the grayscale channel of each specified pixel
-        binary_message = ""
-        for idx in pixel_numbers:
-            pixel = pixels[idx]  # Get the pixel value
-            bit = pixel & 1  # Extract the LSB
-            binary_message += str(bit)
+    @staticmethod
+    def extract_message_from_image(png_image_file_path: str, pixel_numbers_file_path: str,
+                                   progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """
+        Extracts a hidden message from a PNG image by reading the low-order bits of the
+        pixel channels listed in the key file.
 
-        return Steganography.binary_to_text(binary_message)
+        Steps:
+         - Extract the hidden bytes with Steganography.extract_payload_from_image.
+         - Decode them if the key says they were Huffman-packed.
+         - Convert them back to text (one character per byte).
+        """
+        payload, flags = Steganography.extract_payload_from_image(png_image_file_path, pixel_numbers_file_path,
+                                                                  progress)
+        return Steganography.decode_message(payload, flags)
 
     @staticmethod
-    def hide_message_in_audio(wav_audio_file_path: str, secret_message: str,
-                              output_audio_file_path: str, sample_numbers_file_path: str):
+    def extract_payload_from_image(png_image_file_path: str, key_file_path: str,
+                                   progress: Optional[Callable[[int, int], None]] = None) -> tuple[bytes, int]:
         """
-        Hides the secret message in a WAV audio file by modifying the least
-        significant bit (LSB) of the audio samples.
+        Extracts raw bytes hidden by Steganography.embed_payload_in_image.
+
+        progress, if given, receives (bytes_read, file_size) while the whole image is
+        decoded; decoding only its first rows is not reported.
 
         Steps:
-         - Convert the secret message into its 8-bit binary representation.
-         - Open the WAV file and read its frames as audio samples.
-         - For each sample (up to the length of the binary message), modify the LSB.
-           For signed sample values (common for 16-bit audio), convert to the corresponding
-           unsigned representation for bit manipulation and then convert back.
-         - Write the modified samples into a new WAV file with the same parameters.
-         - Save the list of sample indices used in a file.
+         - Read the slot indices, depth and flags from the key file (binary key or legacy
+           text list, which means depth 1).
+         - Open the image lazily and decode only the rows that contain the listed slots.
+         - Gather the low-order bits of every listed slot with a single indexing operation.
+         - Pack the bits back into bytes.
 
-        Note: This function assumes a mono PCM WAV file with either 8-bit or 16-bit samples.
+        :return: A tuple (payload, flags).
         """
-        # Convert secret message to binary
-        binary_text = Steganography.text_to_binary(secret_message)
-        binary_length = len(binary_text)
+        # Read the slot indices from the key (or legacy comma-separated list)
+        slot_numbers, depth, flags = IndexKey.load(key_file_path)
+        if slot_numbers.size == 0:
+            return b"", flags
 
-        # Open the WAV file
-        with wave.open(wav_audio_file_path, 'rb') as wav_in:
-            params = wav_in.getparams()
-            nchannels, sampwidth, framerate, nframes, comptype, compname = params
-            # Read all audio frames
-            frames = wav_in.readframes(nframes)
+        # Open the image lazily: only the header is read at this point
+        img = Image.open(png_image_file_path)
+        if img.mode not in Steganography.IMAGE_MODES:
+            raise ValueError(f"Image must be in one of the {', '.join(Steganography.IMAGE_MODES)} modes.")
+
+        # Decode only the rows up to the last listed slot (seeded keys span the whole image)
+        flat = Steganography.read_image_prefix(img, int(slot_numbers.max()) + 1,
+                                               allow_partial=IndexKey.kind(key_file_path) != IndexKey.SEEDED,
+                                               progress=progress)
+
+        # Gather the low-order bits of every specified slot at once
+        values = flat[slot_numbers] & ((1 << depth) - 1)
 
-        # For simplicity, assume mono (nchannels == 1)
-        if nchannels != 1:
-            raise ValueError("Audio file must be mono for this steganography method.")
+        return Steganography.slot_values_to_bytes(values, depth), flags
 
-        # Determine the format for unpacking based on sample width
+    @staticmethod
+    def read_image_prefix(img: Image.Image, count: int, allow_partial: bool = True,
+                          progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+        """
+        Returns at least the first count channel values of a lazily opened image, as a
+        flat uint8 array in np.asarray(img) order.
+
+        For PNG files, the rows holding those values are inflated first. When unfiltering
+        them with PngRowReader is estimated to cost less than half a full decode (rows
+        using the Average and Paeth filters are unfiltered in Python, see
+        PngRowReader.PYTHON_ROW_COST), only those rows are decoded, so the cost follows
+        the payload rather than the image size. Otherwise, and for other formats, the
+        whole image is decoded by PIL.
+
+        :param allow_partial: False to always decode the whole image, e.g. when the values
+                              are known to be scattered over it.
+        :param progress: Optional callback receiving (bytes_read, file_size) during a
+                         whole decode, which is then done in chunks.
+        """
+        row_size = img.width * len(img.getbands())
+        if count > row_size * img.height:
+            raise ValueError("Pixel index out of range for this image.")
+        rows = -(-count // row_size)
+
+        if allow_partial and img.format == 'PNG' and img.filename and 2 * rows <= img.height:
+            reader = PngRowReader(img.filename)
+            if reader.supports():
+                raw = reader.inflate_rows(rows)
+                if 2 * reader.unfilter_cost(raw) <= img.height:
+                    return reader.unfilter_rows(raw).reshape(-1)
+
+        if progress is not None and img.filename:
+            file_size = os.path.getsize(img.filename)
+            img = Steganography.decode_image_file(img.filename, lambda done: progress(done, file_size))
+        return np.asarray(img).reshape(-1)
+
+    @staticmethod
+    def audio_samples_view(frames: bytearray, sampwidth: int) -> np.ndarray:
+        """
+        Returns a writable NumPy view over raw WAV frame bytes in which element i holds
+        the least significant bits of sample i. Channels stay interleaved, so sample i of
+        a stereo file is channel i % 2 of frame i // 2.
+
+        8, 16 and 32-bit samples are viewed with their native little-endian dtype. 24-bit
+        samples have no NumPy dtype, so the view strides over their low-order byte, which
+        is the one carrying the LSBs.
+        """
         if sampwidth == 1:
-            fmt = f"{nframes}B"  # 8-bit unsigned
-            max_val = 0xFF
+            return np.frombuffer(frames, dtype=np.uint8)  # 8-bit unsigned
         elif sampwidth == 2:
-            fmt = f"<{nframes}h"  # 16-bit signed, little-endian
-            max_val = (1 << (sampwidth * 8)) - 1
-        else:
-            raise ValueError("Only 8-bit and 16-bit audio are supported.")
-
-        # Unpack frames to a tuple of samples
-        samples = list(struct.unpack(fmt, frames))
-
-        if binary_length > len(samples):
-            raise ValueError("Secret message is too long to hide in this audio file.")
-
-        # Use the first binary_length sample indices
-        sample_numbers = list(range(binary_length))
-
-        # Modify the LSB of each selected sample
-        new_samples = samples.copy()
-        for idx, bit in zip(sample_numbers, binary_text):
-            sample = samples[idx]
-            # For 16-bit samples, handle potential negatives by converting to unsigned
-            if sampwidth == 2:
-                # Convert to unsigned representation
-                if sample < 0:
-                    sample_unsigned = sample + (1 << (sampwidth * 8))
-                else:
-                    sample_unsigned = sample
-                # Modify the LSB
-                new_sample_unsigned = (sample_unsigned & ~1) | int(bit)
-                # Convert back to signed if necessary
-                if new_sample_unsigned >= (1 << (sampwidth * 8 - 1)):
-                    new_sample = new_sample_unsigned - (1 << (sampwidth * 8))
-                else:
-                    new_sample = new_sample_unsigned
-            else:
-                # For 8-bit samples (unsigned), simply modify the LSB.
-                new_sample = (sample & ~1) | int(bit)
-            new_samples[idx] = new_sample
+            return np.frombuffer(frames, dtype='<i2')  # 16-bit signed, little-endian
+        elif sampwidth == 3:
+            return np.frombuffer(frames, dtype=np.uint8)[::3]  # low byte of 24-bit samples
+        elif sampwidth == 4:
+            return np.frombuffer(frames, dtype='<i4')  # 32-bit signed, little-endian
+        raise ValueError("Only 8, 16, 24 and 32-bit audio are supported.")
 
-        # Pack the modified samples back to bytes
-        new_frames = struct.pack(fmt, *new_samples)
-
-        # Write the new frames to the output audio file with the same parameters
-        with wave.open(output_audio_file_path, 'wb') as wav_out:
-            wav_out.setparams(params)
-            wav_out.writeframes(new_frames)
+    @staticmethod
+    def embed_values_in_wav_stream(wav_in: wave.Wave_read, wav_out: wave.Wave_write,
+                                   sample_numbers: np.ndarray, values: np.ndarray, depth: int = 1,
+                                   progress: Optional[Callable[[int, int], None]] = None):
+        """
+        Copies every frame of wav_in to wav_out, writing values into the depth low-order
+        bits of the given samples on the way.
+
+        Only the chunks of AUDIO_CHUNK_FRAMES frames that hold a selected sample are
+        viewed and modified; the rest of the audio is copied through in raw blocks of
+        AUDIO_COPY_FRAMES frames. Memory use therefore depends on the payload size, not
+        on the length of the recording. The output must have been given its parameters.
+        progress, if given, receives (frames_copied, total_frames) after each block.
+        """
+        order = np.argsort(sample_numbers, kind='stable')
+        sample_numbers = sample_numbers[order]
+        values = values[order]
+
+        nchannels, sampwidth = wav_in.getnchannels(), wav_in.getsampwidth()
+        frame_size = nchannels * sampwidth
+        last_frame = int(sample_numbers[-1]) // nchannels + 1 if sample_numbers.size else 0
+
+        position = 0
+        while True:
+            # Small chunks while payload samples remain, large raw blocks afterwards
+            chunk = Steganography.AUDIO_CHUNK_FRAMES if position < last_frame else Steganography.AUDIO_COPY_FRAMES
+            data = wav_in.readframes(chunk)
+            if not data:
+                break
+            count = len(data) // frame_size
+
+            # Locate the payload samples falling into this chunk
+            start = np.searchsorted(sample_numbers, position * nchannels)
+            stop = np.searchsorted(sample_numbers, (position + count) * nchannels)
+            if stop > start:
+                data = bytearray(data)
+                samples = Steganography.audio_samples_view(data, sampwidth)
+                local = sample_numbers[start:stop] - position * nchannels
+                samples[local] = (samples[local] >> depth << depth) | values[start:stop]
+
+            wav_out.writeframesraw(data)
+            position += count
+            if progress is not None:
+                progress(position, wav_in.getnframes())
 
-        # Save the sample indices that were modified
-        with open(sample_numbers_file_path, "w") as f:
-            f.write(','.join(str(n) for n in sample_numbers))
+    @staticmethod
+    def read_values_from_wav_stream(wav_in: wave.Wave_read, sample_numbers: np.ndarray, depth: int = 1,
+                                    progress: Optional[Callable[[int, int], None]] = None) -> np.ndarray:
+        """
+        Reads the depth low-order bits of the given samples. The file is positioned with
+        setpos on the first frame still needed, so only chunks that hold listed samples
+        are read and the frames in between are skipped. The values are returned in the
+        order of sample_numbers. progress, if given, receives (samples_read, total_samples)
+        after each chunk.
+        """
+        order = np.argsort(sample_numbers, kind='stable')
+        sorted_numbers = sample_numbers[order]
+
+        nchannels, sampwidth = wav_in.getnchannels(), wav_in.getsampwidth()
+        frame_size = nchannels * sampwidth
+        last_frame = int(sorted_numbers[-1]) // nchannels + 1 if sorted_numbers.size else 0
+        if last_frame > wav_in.getnframes():
+            raise ValueError("Sample index out of range for this audio file.")
+
+        mask = (1 << depth) - 1
+        values = np.empty(sorted_numbers.size, dtype=np.uint8)
+        start = 0
+        while start < sorted_numbers.size:
+            # Jump to the frame holding the next sample still to be read
+            position = int(sorted_numbers[start]) // nchannels
+            wav_in.setpos(position)
+            data = wav_in.readframes(min(Steganography.AUDIO_CHUNK_FRAMES, last_frame - position))
+            count = len(data) // frame_size
+            if count == 0:
+                raise ValueError("Audio file is truncated.")
+
+            stop = np.searchsorted(sorted_numbers, (position + count) * nchannels)
+            samples = Steganography.audio_samples_view(data, sampwidth)
+            values[start:stop] = samples[sorted_numbers[start:stop] - position * nchannels] & mask
+            start = stop
+            if progress is not None:
+                progress(int(start), sorted_numbers.size)
+
+        result = np.empty_like(values)
+        result[order] = values
+        return result
 
     @staticmethod
-    def extract_message_from_audio(wav_audio_file_path: str, sample_numbers_file_path: str) -> str:
+    def hide_message_in_audio(wav_audio_file_path: str, secret_message: str,
+                              output_audio_file_path: str, sample_numbers_file_path: str,
+                              seed: Optional[int] = None, depth: int = 1, compress: bool = False,
+                              progress: Optional[Callable[[int, int], None]] = None):
         """
-        Extracts a hidden message from a WAV audio file by reading the least
-        significant bit (LSB) from the samples specified in the sample numbers file.
+        Hides the secret message in a WAV audio file by modifying the low-order bits of
+        the audio samples. Each character is encoded as 8-bit binary and a compact index
+        key (see IndexKey) is saved alongside the audio.
+
+        With compress, the message is Huffman-encoded first, which usually shrinks text
+        by about 40% and touches that many fewer carrier values; the key records it so
+        that extraction decodes it transparently.
 
         Steps:
-         - Read the list of sample indices from the given file.
-         - Open the WAV file and read its audio samples.
-         - For each specified sample, extract the LSB and reassemble the binary message.
-         - Convert the binary message back into the text.
+         - Convert the secret message into bytes (8 bits per character), Huffman-packed
+           if requested.
+         - Embed them with Steganography.embed_payload_in_audio.
+        """
+        payload, flags = Steganography.encode_message(secret_message, compress)
+        Steganography.embed_payload_in_audio(
+            wav_audio_file_path, payload, output_audio_file_path, sample_numbers_file_path, seed=seed, depth=depth,
+            flags=flags, progress=progress
+        )
+
+    @staticmethod
+    def embed_payload_in_audio(wav_audio_file_path: str, payload: bytes, output_audio_file_path: str,
+                               key_file_path: str, seed: Optional[int] = None, depth: int = 1,
+                               flags: int = 0, progress: Optional[Callable[[int, int], None]] = None):
+        """
+        Hides raw bytes inside a WAV audio file, depth bits per sample.
+
+        Without a seed, the first samples are used; with a seed, the samples follow a
+        pseudo-random permutation of the whole file (see IndexKey).
 
-        Note: This function assumes the audio is mono and has either 8-bit or 16-bit samples.
+        Steps:
+         - Split the payload into groups of depth bits.
+         - Open the WAV file and check from its header that it has enough samples.
+         - Stream the frames to the output file, overwriting the low-order bits of the
+           selected samples in place on a typed view of the chunks that hold them.
+           Shifting right then left clears those bits in signed and unsigned samples
+           alike, so no per-sample conversion is needed.
+         - Save the key of the samples used (with the depth and flags) in a file.
+
+        Note: Samples of every channel are used, in their interleaved order. 8, 16, 24
+        and 32-bit PCM files are supported. Memory use does not grow with the audio length.
         """
-        # Read the sample indices
-        with open(sample_numbers_file_path, "r") as f:
-            content = f.read().strip()
-        if not content:
-            raise ValueError("No sample indices found in the provided file.")
-        sample_numbers = [int(num) for num in content.split(',')]
+        Steganography.check_depth(depth)
+        values = Steganography.bytes_to_slot_values(payload, depth)
 
-        # Open the WAV file
         with wave.open(wav_audio_file_path, 'rb') as wav_in:
             params = wav_in.getparams()
-            nchannels, sampwidth, framerate, nframes, comptype, compname = params
-            frames = wav_in.readframes(nframes)
+            if params.sampwidth not in (1, 2, 3, 4):
+                raise ValueError("Only 8, 16, 24 and 32-bit audio are supported.")
+            population = params.nframes * params.nchannels
+            if values.size > population:
+                raise ValueError("Secret message is too long to hide in this audio file.")
+
+            # Select one sample per group of bits
+            if seed is None:
+                sample_numbers = np.arange(values.size)
+            else:
+                sample_numbers = IndexKey.seeded_indices(seed, values.size, population)
+
+            # Stream the frames to the output audio file with the same parameters, removing
+            # it if the copy is interrupted (e.g. by progress raising)
+            try:
+                with wave.open(output_audio_file_path, 'wb') as wav_out:
+                    wav_out.setparams(params)
+                    Steganography.embed_values_in_wav_stream(wav_in, wav_out, sample_numbers, values, depth,
+                                                             progress)
+            except BaseException:
+                os.remove(output_audio_file_path)
+                raise
+
+        # Save the key of the sample indices that were modified
+        if seed is None:
+            IndexKey.write_range(key_file_path, values.size, depth=depth, flags=flags)
+        else:
+            IndexKey.write_seeded(key_file_path, seed, values.size, population, depth=depth, flags=flags)
 
-        if nchannels != 1:
-            raise ValueError("Audio file must be mono for this steganography method.")
+    @staticmethod
+    def extract_message_from_audio(wav_audio_file_path: str, sample_numbers_file_path: str,
+                                   progress: Optional[Callable[[int, int], None]] = None) -> str:
+        """
+        Extracts a hidden message from a WAV audio file by reading the low-order bits of
+        the samples listed in the key file.
 
-        # Determine the unpacking format
-        if sampwidth == 1:
-            fmt = f"{nframes}B"  # 8-bit unsigned
-        elif sampwidth == 2:
-            fmt = f"<{nframes}h"  # 16-bit signed
-        else:
-            raise ValueError("Only 8-bit and 16-bit audio are supported.")
-
-        samples = list(struct.unpack(fmt, frames))
-
-        # Extract the LSB from each specified sample to reconstruct the binary message
-        binary_message = ""
-        for idx in sample_numbers:
-            sample = samples[idx]
-            if sampwidth == 2:
-                # For signed 16-bit, convert to unsigned representation if necessary
-                if sample < 0:
-                    sample_unsigned = sample + (1 << (sampwidth * 8))
-                else:
-                    sample_unsigned = sample
-                bit = sample_unsigned & 1
-            else:
-                bit = sample & 1
-            binary_message += str(bit)
+        Steps:
+         - Extract the hidden bytes with Steganography.extract_payload_from_audio.
+         - Decode them if the key says they were Huffman-packed.
+         - Convert them back to text (one character per byte).
+        """
+        payload, flags = Steganography.extract_payload_from_audio(wav_audio_file_path, sample_numbers_file_path,
+                                                                  progress)
+        return Steganography.decode_message(payload, flags)
+
+    @staticmethod
+    def extract_payload_from_audio(wav_audio_file_path: str, key_file_path: str,
+                                   progress: Optional[Callable[[int, int], None]] = None) -> tuple[bytes, int]:
+        """
+        Extracts raw bytes hidden by Steganography.embed_payload_in_audio.
+
+        Steps:
+         - Read the sample indices, depth and flags from the key file (binary key or
+           legacy text list, which means depth 1).
+         - Seek to the WAV frames holding the listed samples and read only those chunks.
+         - Gather the low-order bits of the listed samples from a typed NumPy view.
+         - Pack the bits back into bytes.
+
+        Note: Samples of every channel are used, in their interleaved order. 8, 16, 24
+        and 32-bit PCM files are supported.
+
+        :return: A tuple (payload, flags).
+        """
+        # Read the sample indices from the key (or legacy comma-separated list)
+        sample_numbers, depth, flags = IndexKey.load(key_file_path)
+        if sample_numbers.size == 0:
+            return b"", flags
+
+        with wave.open(wav_audio_file_path, 'rb') as wav_in:
+            values = Steganography.read_values_from_wav_stream(wav_in, sample_numbers, depth, progress)
 
-        return Steganography.binary_to_text(binary_message)
+        return Steganography.slot_values_to_bytes(values, depth), flags
@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from steganography.BatchSteganography import BatchSteganography
+
+
+def noise_image(path, seed):
+    rng = np.random.default_rng(seed)
+    Image.fromarray(rng.integers(0, 256, (40, 40, 3), dtype=np.uint8)).save(path)
+    return str(path)
+
+
+def test_lossy_sources_are_saved_as_png(tmp_path):
+    carriers = [noise_image(tmp_path / "a.jpg", 0), noise_image(tmp_path / "b.png", 1)]
+    manifest_path = str(tmp_path / "manifest.json")
+    message = "hello world " * 100
+
+    manifest = BatchSteganography.hide_message(carriers, message, str(tmp_path / "parts"), manifest_path,
+                                               max_workers=2)
+    assert [part["carrier"].endswith(".png") for part in manifest["parts"]] == [True, True]
+    assert BatchSteganography.extract_message(manifest_path, max_workers=2) == message
+
+
+def test_altered_carrier_is_detected(tmp_path):
+    carriers = [noise_image(tmp_path / "a.png", 0)]
+    manifest_path = tmp_path / "manifest.json"
+    BatchSteganography.hide_message(carriers, "secret", str(tmp_path / "parts"), str(manifest_path), max_workers=1)
+
+    part = tmp_path / json.loads(manifest_path.read_text())["parts"][0]["carrier"]
+    pixels = np.array(Image.open(part))
+    pixels.reshape(-1)[:8] ^= 1
+    Image.fromarray(pixels).save(part)
+    with pytest.raises(ValueError, match="corrupted"):
+        BatchSteganography.extract_message(str(manifest_path), max_workers=1)
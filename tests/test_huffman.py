@@ -0,0 +1,172 @@
+import hashlib
+import io
+import json
+import random
+import string
+
+import pytest
+
+from huffman.CommandLine import CommandLine
+from huffman.Huffman import CorruptBlockError, Huffman
+
+
+def write_archive(tmp_path, data, code_dict, name="archive"):
+    """Writes an encoded text and its dictionary as compress does; returns their paths."""
+    compressed_path = tmp_path / f"{name}.huff"
+    dictionary_path = tmp_path / f"{name}_dict.json"
+    compressed_path.write_bytes(data)
+    dictionary_path.write_text(json.dumps(code_dict))
+    return str(compressed_path), str(dictionary_path)
+
+
+@pytest.mark.parametrize("text", ["", "123", "!?\n"])
+@pytest.mark.parametrize("streams, checksum", [(None, False), (4, False), (None, True)])
+def test_text_without_letters(tmp_path, text, streams, checksum):
+    data, code_dict = Huffman.encode_text(text, streams=streams, checksum=checksum)
+    assert code_dict == {}
+    assert Huffman.decode_data(data, code_dict) == ""
+    result = Huffman.verify(*write_archive(tmp_path, data, code_dict))
+    assert result.error is None and result.symbols == 0
+
+
+def test_empty_file_from_the_command_line(tmp_path):
+    source = tmp_path / "empty.txt"
+    source.write_text("")
+    for options in ([], ["--no-checksum"]):
+        assert CommandLine.main(["-q", "compress", str(source)] + options) == 0
+        assert CommandLine.main(["-q", "decompress", str(tmp_path / "empty.huff"), "--force"]) == 0
+        assert source.read_text() == ""
+    assert (tmp_path / "empty.huff").read_bytes() == b"\x00"
+
+
+def sample_text(words=6000, seed=0):
+    """Words drawn from a small vocabulary, with a few rare ones, as in natural text."""
+    rng = random.Random(seed)
+    vocabulary = ["the", "of", "and", "huffman", "code", "tree", "a", "in", "block", "stream"]
+    rare = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 9))) for _ in range(300)]
+    return " ".join(rng.choice(vocabulary) if rng.random() < 0.8 else rng.choice(rare) for _ in range(words))
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Blocks of 1000 symbols, so that a short text spans many blocks."""
+    monkeypatch.setattr(Huffman, "BLOCK_SYMBOLS", 1000)
+
+
+def block_offsets(data):
+    """Returns the offset in data of the first stream byte of every block."""
+    f = io.BytesIO(data)
+    version, streams, block_symbols, _ = Huffman.read_block_header(f)
+    # iter_blocks reads a whole block before yielding it: f is then at the next one.
+    starts = [f.tell()] + [f.tell() for _ in Huffman.iter_blocks(f, version, streams, block_symbols)]
+    return [start + Huffman.BLOCK_COUNT_FIELD.size + 4 * streams for start in starts[:-1]]
+
+
+@pytest.mark.parametrize("alphabet", Huffman.ALPHABETS)
+@pytest.mark.parametrize("streams, checksum", [(None, False), (1, False), (4, False), (7, False), (7, True)])
+def test_round_trip(small_blocks, alphabet, streams, checksum):
+    text = sample_text()
+    data, code_dict = Huffman.encode_text(text, streams=streams, alphabet=alphabet, checksum=checksum)
+    assert data.startswith(Huffman.BLOCK_MAGIC) == (streams is not None)
+    assert Huffman.decode_data(data, code_dict) == text
+
+
+@pytest.mark.parametrize("alphabet", Huffman.ALPHABETS)
+def test_tokenize_cuts_the_text_into_symbols(alphabet):
+    text = sample_text(2000)
+    symbols = Huffman.tokenize(text, alphabet)
+    assert "".join(symbols) == text
+    if alphabet == "digram":
+        assert {len(symbol) for symbol in symbols} == {1, 2}
+        assert len({symbol for symbol in symbols if len(symbol) == 2}) <= Huffman.DIGRAM_COUNT
+    if alphabet == "word":
+        assert "the " in symbols
+
+
+def test_lockstep_and_serial_decoders_agree(small_blocks, monkeypatch):
+    text = sample_text()
+    data, code_dict = Huffman.encode_text(text, streams=4, alphabet="digram")
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("wrong decoder")
+
+    # 1. Many lanes: lockstep only.
+    monkeypatch.setattr(Huffman, "MIN_LOCKSTEP_LANES", 1)
+    with monkeypatch.context() as patched:
+        patched.setattr(Huffman, "decode_lanes_serially", refuse)
+        assert Huffman.decode_data(data, code_dict) == text
+
+    # 2. Too few lanes: serial only.
+    monkeypatch.setattr(Huffman, "MIN_LOCKSTEP_LANES", 1 << 30)
+    with monkeypatch.context() as patched:
+        patched.setattr(Huffman, "decode_lanes_in_lockstep", refuse)
+        assert Huffman.decode_data(data, code_dict) == text
+
+
+@pytest.mark.parametrize("lockstep", [True, False])
+def test_flipped_byte_is_located(small_blocks, monkeypatch, tmp_path, lockstep):
+    monkeypatch.setattr(Huffman, "MIN_LOCKSTEP_LANES", 1 if lockstep else 1 << 30)
+    monkeypatch.setattr(Huffman, "VERIFY_LANES", 8)
+    text = sample_text()
+    data, code_dict = Huffman.encode_text(text, streams=4, checksum=True)
+    offsets = block_offsets(data)
+    assert len(offsets) > 10
+
+    corrupted = bytearray(data)
+    corrupted[offsets[7] + 1] ^= 0x40
+    with pytest.raises(CorruptBlockError) as error:
+        Huffman.decode_data(bytes(corrupted), code_dict)
+    assert error.value.block == 7
+
+    result = Huffman.verify(*write_archive(tmp_path, bytes(corrupted), code_dict))
+    assert result.ok is False and result.block == 7
+
+
+def test_truncated_file_is_located(small_blocks, tmp_path):
+    data, code_dict = Huffman.encode_text(sample_text(), streams=4, checksum=True)
+    offsets = block_offsets(data)
+    with pytest.raises(CorruptBlockError, match="truncated") as error:
+        Huffman.decode_data(data[:offsets[5] + 2], code_dict)
+    assert error.value.block == 5
+
+    result = Huffman.verify(*write_archive(tmp_path, data[:offsets[5] + 2], code_dict))
+    assert result.ok is False and result.block == 5
+
+
+def test_verify_results(small_blocks, tmp_path):
+    text = sample_text()
+    digest = hashlib.sha256(text.encode()).hexdigest()
+
+    data, code_dict = Huffman.encode_text(text, streams=4, checksum=True)
+    result = Huffman.verify(*write_archive(tmp_path, data, code_dict, "checked"))
+    assert result.ok is True and result.checksummed and result.digest == digest
+    assert result.blocks == len(block_offsets(data)) and result.symbols == len(text)
+
+    # Without checksums, a clean decoding does not make the archive ok.
+    for streams in (None, 4):
+        data, code_dict = Huffman.encode_text(text, streams=streams)
+        result = Huffman.verify(*write_archive(tmp_path, data, code_dict, "unchecked"))
+        assert result.ok is None and result.error is None and result.digest == digest
+
+
+def test_command_line(tmp_path, capsys):
+    source = tmp_path / "book.txt"
+    text = sample_text(3000)
+    source.write_text(text)
+
+    assert CommandLine.main(["compress", str(source), "-a", "word"]) == 0
+    stats = json.loads(capsys.readouterr().out)
+    assert stats["files"][0]["output"] == str(tmp_path / "book.huff")
+
+    assert CommandLine.main(["-q", "verify", str(tmp_path / "book.huff")]) == 0
+    source.unlink()
+    assert CommandLine.main(["-q", "decompress", str(tmp_path / "book.huff")]) == 0
+    assert source.read_text() == text
+
+    corrupted = bytearray((tmp_path / "book.huff").read_bytes())
+    corrupted[-10] ^= 0x01
+    (tmp_path / "book.huff").write_bytes(bytes(corrupted))
+    assert CommandLine.main(["-q", "verify", str(tmp_path / "book.huff")]) == 1
+
+    assert CommandLine.main(["-q", "compress", str(source), "--no-checksum"]) == 0
+    assert CommandLine.main(["-q", "verify", str(tmp_path / "book.huff")]) == 2
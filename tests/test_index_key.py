@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from steganography.IndexKey import IndexKey
+from steganography.Steganography import Steganography
+
+
+def test_range_key_round_trip(tmp_path):
+    key = str(tmp_path / "range.key")
+    IndexKey.write_range(key, 5, start=3, step=2, depth=2, flags=1)
+    indices, depth, flags = IndexKey.load(key)
+    assert indices.tolist() == [3, 5, 7, 9, 11]
+    assert (depth, flags) == (2, 1)
+    assert IndexKey.kind(key) == IndexKey.RANGE
+
+
+def test_seeded_key_round_trip(tmp_path):
+    key = str(tmp_path / "seeded.key")
+    IndexKey.write_seeded(key, IndexKey.SEED_LIMIT - 1, 100, 1000)
+    indices, _, _ = IndexKey.load(key)
+    assert np.array_equal(indices, IndexKey.seeded_indices(IndexKey.SEED_LIMIT - 1, 100, 1000))
+    assert len(set(indices.tolist())) == 100 and indices.max() < 1000
+    assert IndexKey.kind(key) == IndexKey.SEEDED
+
+
+def test_legacy_text_key(tmp_path):
+    key = tmp_path / "legacy.txt"
+    key.write_text("4,1,9")
+    assert IndexKey.load(str(key))[0].tolist() == [4, 1, 9]
+    assert IndexKey.kind(str(key)) is None
+
+
+@pytest.mark.parametrize("seed", [-1, IndexKey.SEED_LIMIT])
+def test_out_of_range_seed_is_rejected_before_writing(tmp_path, seed):
+    carrier = str(tmp_path / "carrier.png")
+    Image.new("RGB", (8, 8)).save(carrier)
+    output, key = tmp_path / "output.png", tmp_path / "output.key"
+    with pytest.raises(ValueError):
+        Steganography.embed_payload_in_image(carrier, b"hi", str(output), str(key), seed=seed)
+    assert not output.exists() and not key.exists()
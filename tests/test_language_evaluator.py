@@ -0,0 +1,49 @@
+import json
+import random
+
+from evaluator.LanguageEvaluator import LanguageEvaluator
+
+
+def random_codes(count, seed=0):
+    """Yields small random binary codes: 2 to 5 distinct codewords of 1 to 4 bits."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        size = rng.randint(2, 5)
+        code = set()
+        while len(code) < size:
+            code.add("".join(rng.choice("01") for _ in range(rng.randint(1, 4))))
+        yield sorted(code)
+
+
+def test_polynomial_verdict_matches_quotient_method(tmp_path):
+    language_file = tmp_path / "code.json"
+    for code in random_codes(1000):
+        language_file.write_text(json.dumps(code))
+        assert (LanguageEvaluator.is_uniquely_decodable(set(code))
+                == LanguageEvaluator.evaluate_language_quotient(str(language_file))), code
+
+
+def test_witness_has_two_distinct_factorizations():
+    for code in random_codes(1000, seed=1):
+        found = LanguageEvaluator.find_ambiguous_witness(set(code))
+        if LanguageEvaluator.is_uniquely_decodable(set(code)):
+            assert found is None, code
+            continue
+
+        witness, first, second = found
+        assert first != second, code
+        assert "".join(first) == witness == "".join(second), code
+        assert set(first) <= set(code) and set(second) <= set(code), code
+
+
+def test_quotient_method_reads_codes_of_a_dictionary(tmp_path):
+    language_file = tmp_path / "dict.json"
+    # The letters form a prefix-free set, the codes do not ("0" + "1" = "01").
+    language_file.write_text(json.dumps({"a": "0", "b": "1", "c": "01"}))
+    assert LanguageEvaluator.evaluate_language_quotient(str(language_file)) is False
+
+    language_file.write_text(json.dumps({"a": "0", "b": "10", "c": "11"}))
+    assert LanguageEvaluator.evaluate_language_quotient(str(language_file)) is True
+
+    language_file.write_text(json.dumps({"a": "0", "b": "0"}))
+    assert LanguageEvaluator.evaluate_language_quotient(str(language_file)) is False